@@ -0,0 +1,76 @@
+import argparse
+from typing import Optional, Sequence
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def recount_statement(todolist_ids: Sequence[int]):
+    """UPDATE des compteurs d'un lot de TodoLists à partir de la table todos ; seules les lignes fausses sont écrites"""
+    counts = (
+        select(
+            models.Todo.todolist_id.label("todolist_id"),
+            func.count(models.Todo.id).label("total"),
+            func.sum(case((models.Todo.completed == True, 1), else_=0)).label("completed"),
+        )
+        .where(models.Todo.todolist_id.in_(todolist_ids))
+        .group_by(models.Todo.todolist_id)
+        .subquery()
+    )
+    total = func.coalesce(
+        select(counts.c.total).where(counts.c.todolist_id == models.TodoList.id).scalar_subquery(), 0
+    )
+    completed = func.coalesce(
+        select(counts.c.completed).where(counts.c.todolist_id == models.TodoList.id).scalar_subquery(), 0
+    )
+
+    return (
+        update(models.TodoList)
+        .where(models.TodoList.id.in_(todolist_ids))
+        .where((models.TodoList.total_count != total) | (models.TodoList.completed_count != completed))
+        .values(total_count=total, completed_count=completed)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def repair_counts(db: Session, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Recalcule les compteurs de toutes les TodoLists, lot par lot (un commit par lot).
+
+    Retourne le nombre de TodoLists corrigées.
+    """
+    repaired = 0
+    last_id: Optional[int] = None
+    while True:
+        query = db.query(models.TodoList.id).order_by(models.TodoList.id)
+        if last_id is not None:
+            query = query.filter(models.TodoList.id > last_id)
+        ids = [row.id for row in query.limit(batch_size)]
+        if not ids:
+            return repaired
+
+        repaired += db.execute(recount_statement(ids)).rowcount
+        db.commit()
+        last_id = ids[-1]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Recalcule les compteurs total_count / completed_count des TodoLists")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        repaired = repair_counts(db, args.batch_size)
+    finally:
+        db.close()
+    print(f"✅ {repaired} TodoList(s) corrigée(s).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import os
+from typing import Optional
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.db import models
+
+# Verrou pessimiste optionnel (SELECT ... FOR UPDATE) sur la TodoList parente
+ROW_LOCK_ENABLED = os.getenv("TODOLIST_ROW_LOCK", "false").lower() in ("1", "true", "yes")
+
+
+def todolist_etag(todolist_id: int, version: int) -> str:
+    """ETag fort d'une TodoList, dérivé de son compteur de version"""
+    return f'"{todolist_id}-{version}"'
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """Vérifie un en-tête If-Match / If-None-Match (liste d'ETags ou `*`)"""
+    if header is None:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def set_etag(response: Response, todolist: models.TodoList) -> None:
+    response.headers["ETag"] = todolist_etag(todolist.id, todolist.version)
+
+
+def acquire_todolist(db: Session, todolist_id: int, if_match: Optional[str] = None) -> Optional[models.TodoList]:
+    """Sérialise les écritures sur une TodoList et vérifie la précondition If-Match.
+
+    La version est incrémentée au début de la transaction : l'UPDATE verrouille la ligne
+    jusqu'au commit, les écritures concurrentes sur la même liste attendent donc leur tour.
+    Retourne None si la TodoList n'existe pas, lève une 412 si la version ne correspond plus.
+    """
+    query = db.query(models.TodoList).filter(models.TodoList.id == todolist_id)
+    if ROW_LOCK_ENABLED:
+        query = query.with_for_update()
+    todolist = query.first()
+    if not todolist:
+        return None
+
+    expected_version = todolist.version
+    bump = db.query(models.TodoList).filter(models.TodoList.id == todolist_id)
+
+    if if_match is not None:
+        if not etag_matches(if_match, todolist_etag(todolist_id, expected_version)):
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail="TodoList has been modified"
+            )
+        # Compare-and-swap : une écriture concurrente commitée entre-temps fait échouer la précondition
+        bump = bump.filter(models.TodoList.version == expected_version)
+
+    updated = bump.update(
+        {models.TodoList.version: models.TodoList.version + 1},
+        synchronize_session=False
+    )
+    if not updated:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="TodoList has been modified"
+        )
+
+    if if_match is None:
+        # Sans précondition, une écriture concurrente a pu passer avant nous : on relit la version
+        db.refresh(todolist, ["version"])
+    else:
+        set_committed_value(todolist, "version", expected_version + 1)
+    return todolist
@@ -1,6 +1,10 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Text, UniqueConstraint, CheckConstraint
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Date, DateTime, Text, UniqueConstraint, CheckConstraint, Index, DDL, event, inspect
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.sql import func
 from app.db.session import Base
+from app.db.text import normalize_name
 from sqlalchemy.orm import relationship
 
 
@@ -10,10 +14,15 @@ class TodoList(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     created_at = Column(DateTime, server_default=func.now())
+    # Compteur incrémenté à chaque écriture sur la liste ou ses todos (ETag / If-Match)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # Compteurs dénormalisés, tenus à jour par les écouteurs sur Todo (voir en fin de module)
+    total_count = Column(Integer, nullable=False, default=0, server_default="0")
+    completed_count = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Relations
-    todos = relationship("Todo", back_populates="todolist", cascade="all, delete-orphan")
-    category = relationship("Category", back_populates="todolist")
+    todos = relationship("Todo", back_populates="todolist", cascade="all, delete-orphan", lazy="raise_on_sql")
+    category = relationship("Category", back_populates="todolist", lazy="raise_on_sql")
     
     # Foreign Keys
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
@@ -32,7 +41,7 @@ class Category(Base):
     created_at = Column(DateTime, server_default=func.now())
     
     # Relations
-    todolist = relationship("TodoList", back_populates="category")
+    todolist = relationship("TodoList", back_populates="category", lazy="raise_on_sql")
 
     def __repr__(self):
         return f"<Category(name='{self.name}', color='{self.color}')>"
@@ -46,19 +55,41 @@ class Todo(Base):
     completed = Column(Boolean, default=False)
     priority = Column(Integer, default=1)
     created_at = Column(DateTime, server_default=func.now())
-    completed_at = Column(DateTime, nullable=True)
+    # Renseignée à chaque passage à l'état terminé, remise à NULL sinon (voir écouteurs en fin de module)
+    completed_at = Column(DateTime, nullable=True, index=True)
     description = Column(String, nullable=True)
     quantity = Column(String, nullable=True)
+    # Clé fractionnaire triable (mode d'ordonnancement "rank")
+    rank = Column(String(64), nullable=True)
+    # Nom normalisé (sans accents, minuscules) indexé pour la recherche, tenu à jour par écouteur
+    search_name = Column(String, nullable=True)
     
     # Foreign Keys
     todolist_id = Column(Integer, ForeignKey("todolist.id"), nullable=False)
     
     # Relations
-    todolist = relationship("TodoList", back_populates="todos")
+    todolist = relationship("TodoList", back_populates="todos", lazy="raise_on_sql")
+
+    __table_args__ = (
+        Index('ix_todos_todolist_completed_rank', 'todolist_id', 'completed', 'rank'),
+        Index('ix_todos_todolist_priority_id', 'todolist_id', 'priority', 'id'),
+    )
 
     def __repr__(self):
         return f"<Todo(name='{self.name}', completed={self.completed})>"
 
+class DailyActivity(Base):
+    """Agrégat journalier par TodoList : todos créées et terminées ce jour-là"""
+    __tablename__ = "daily_activity"
+
+    day = Column(Date, primary_key=True)
+    todolist_id = Column(Integer, ForeignKey("todolist.id", ondelete="CASCADE"), primary_key=True)
+    created = Column(Integer, nullable=False, default=0, server_default="0")
+    completed = Column(Integer, nullable=False, default=0, server_default="0")
+
+    def __repr__(self):
+        return f"<DailyActivity(day={self.day}, todolist_id={self.todolist_id})>"
+
 class Link(Base):
     __tablename__ = "links"
 
@@ -70,8 +101,8 @@ class Link(Base):
     created_at = Column(DateTime, server_default=func.now())
     
     # Relations
-    parent_todolist = relationship("TodoList", foreign_keys=[todolist_id_parent])
-    child_todolist = relationship("TodoList", foreign_keys=[todolist_id_child])
+    parent_todolist = relationship("TodoList", foreign_keys=[todolist_id_parent], lazy="raise_on_sql")
+    child_todolist = relationship("TodoList", foreign_keys=[todolist_id_child], lazy="raise_on_sql")
     
     # Contrainte d'unicité pour éviter les doublons
     __table_args__ = (
@@ -79,4 +110,143 @@ class Link(Base):
         CheckConstraint('todolist_id_parent != todolist_id_child', name='prevent_self_link')
     )
     def __repr__(self):
-        return f"<Link(parent_id={self.todolist_id_parent}, child_id={self.todolist_id_child})>"
\ No newline at end of file
+        return f"<Link(parent_id={self.todolist_id_parent}, child_id={self.todolist_id_child})>"
+
+
+# ===== COMPTEURS DÉNORMALISÉS DES TODOLISTS =====
+# Chaque écriture ORM sur une todo ajuste les compteurs de sa liste dans le même flush,
+# donc dans la même transaction. Les UPDATE massifs ne passent pas par ici : ils ne
+# doivent jamais modifier `completed` ni `todolist_id`.
+
+def _adjust_counts(connection, todolist_id, total, completed):
+    if not total and not completed:
+        return
+    table = TodoList.__table__
+    connection.execute(
+        table.update()
+        .where(table.c.id == todolist_id)
+        .values(
+            total_count=table.c.total_count + total,
+            completed_count=table.c.completed_count + completed
+        )
+    )
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _bump_activity(connection, todolist_id, day, created=0, completed=0):
+    """Incrémente la ligne (jour, liste) de daily_activity, créée au besoin (upsert)"""
+    if day is None or (not created and not completed):
+        return
+    table = DailyActivity.__table__
+    dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(table).values(
+        day=day, todolist_id=todolist_id, created=created, completed=completed
+    )
+    connection.execute(
+        statement.on_conflict_do_update(
+            index_elements=[table.c.day, table.c.todolist_id],
+            set_={
+                "created": table.c.created + statement.excluded.created,
+                "completed": table.c.completed + statement.excluded.completed,
+            }
+        )
+    )
+
+
+@event.listens_for(Todo, "before_insert")
+def _stamp_inserted_todo(mapper, connection, target):
+    target.search_name = normalize_name(target.name)
+    if target.completed and target.completed_at is None:
+        target.completed_at = _utcnow()
+
+
+@event.listens_for(Todo, "before_update")
+def _stamp_updated_todo(mapper, connection, target):
+    state = inspect(target)
+    if state.attrs.name.history.has_changes():
+        target.search_name = normalize_name(target.name)
+    if state.attrs.completed.history.has_changes():
+        target.completed_at = _utcnow() if target.completed else None
+
+
+@event.listens_for(Todo, "after_insert")
+def _count_inserted_todo(mapper, connection, target):
+    _adjust_counts(connection, target.todolist_id, 1, int(bool(target.completed)))
+    _bump_activity(connection, target.todolist_id, _utcnow().date(), created=1)
+    if target.completed_at is not None:
+        _bump_activity(connection, target.todolist_id, target.completed_at.date(), completed=1)
+
+
+@event.listens_for(Todo, "after_delete")
+def _count_deleted_todo(mapper, connection, target):
+    _adjust_counts(connection, target.todolist_id, -1, -int(bool(target.completed)))
+
+
+@event.listens_for(Todo, "after_update")
+def _count_updated_todo(mapper, connection, target):
+    state = inspect(target)
+    completed_history = state.attrs.completed.history
+    todolist_history = state.attrs.todolist_id.history
+    if not completed_history.has_changes() and not todolist_history.has_changes():
+        return
+
+    was_completed = int(bool(completed_history.deleted[0] if completed_history.deleted else target.completed))
+    is_completed = int(bool(target.completed))
+    old_todolist_id = todolist_history.deleted[0] if todolist_history.deleted else target.todolist_id
+
+    if old_todolist_id != target.todolist_id:
+        _adjust_counts(connection, old_todolist_id, -1, -was_completed)
+        _adjust_counts(connection, target.todolist_id, 1, is_completed)
+    else:
+        _adjust_counts(connection, target.todolist_id, 0, is_completed - was_completed)
+
+    # Une complétion annulée est retirée du jour où elle avait été comptée
+    completed_at_history = state.attrs.completed_at.history
+    if completed_at_history.has_changes():
+        previous = completed_at_history.deleted[0] if completed_at_history.deleted else None
+        if previous is not None:
+            _bump_activity(connection, old_todolist_id, previous.date(), completed=-1)
+        if target.completed_at is not None:
+            _bump_activity(connection, target.todolist_id, target.completed_at.date(), completed=1)
+
+
+@event.listens_for(TodoList, "after_delete")
+def _delete_todolist_activity(mapper, connection, target):
+    # SQLite n'applique pas ON DELETE CASCADE sans PRAGMA foreign_keys
+    table = DailyActivity.__table__
+    connection.execute(table.delete().where(table.c.todolist_id == target.id))
+
+
+# ===== INDEX DE RECHERCHE =====
+# PostgreSQL : tsvector (GIN) + trigrammes (pg_trgm) sur search_name.
+# SQLite : table FTS5 à contenu externe, synchronisée par triggers.
+# Les mêmes instructions sont jouées par la migration correspondante.
+
+SEARCH_TSVECTOR_SQL = "to_tsvector('simple', coalesce(search_name, ''))"
+
+POSTGRESQL_SEARCH_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE INDEX IF NOT EXISTS ix_todos_search_name_tsv ON todos USING gin ({SEARCH_TSVECTOR_SQL})",
+    "CREATE INDEX IF NOT EXISTS ix_todos_search_name_trgm ON todos USING gin (search_name gin_trgm_ops)",
+]
+
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS todos_fts USING fts5("
+    "search_name, content='todos', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS todos_fts_insert AFTER INSERT ON todos BEGIN "
+    "INSERT INTO todos_fts(rowid, search_name) VALUES (new.id, new.search_name); END",
+    "CREATE TRIGGER IF NOT EXISTS todos_fts_delete AFTER DELETE ON todos BEGIN "
+    "INSERT INTO todos_fts(todos_fts, rowid, search_name) VALUES ('delete', old.id, old.search_name); END",
+    "CREATE TRIGGER IF NOT EXISTS todos_fts_update AFTER UPDATE OF search_name ON todos BEGIN "
+    "INSERT INTO todos_fts(todos_fts, rowid, search_name) VALUES ('delete', old.id, old.search_name); "
+    "INSERT INTO todos_fts(rowid, search_name) VALUES (new.id, new.search_name); END",
+]
+
+for _statement in POSTGRESQL_SEARCH_DDL:
+    event.listen(Todo.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+for _statement in SQLITE_SEARCH_DDL:
+    event.listen(Todo.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(Todo.__table__, "before_drop", DDL("DROP TABLE IF EXISTS todos_fts").execute_if(dialect="sqlite"))
@@ -0,0 +1,377 @@
+import os
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, case, func, or_, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.db import models
+
+# Mode d'ordonnancement des todos :
+#  - "priority" : entiers 1..n renumérotés à chaque écriture (comportement historique)
+#  - "rank"     : clés fractionnaires triables, une seule ligne écrite par insertion/déplacement
+ORDERING_MODE = os.getenv("TODO_ORDERING_MODE", "priority").lower()
+
+# Alphabet base 36 : l'ordre lexicographique des clés suit l'ordre numérique
+RANK_ALPHABET = "0123456789abcdefghijklmnopqrstuvwxyz"
+RANK_BASE = len(RANK_ALPHABET)
+
+# Largeur minimale utilisée pour les ajouts en tête / en fin de liste
+RANK_SHIFT_WIDTH = 6
+
+# Au-delà de cette longueur, la liste est rééquilibrée
+RANK_MAX_LENGTH = int(os.getenv("TODO_RANK_MAX_LENGTH", "24"))
+
+
+def is_rank_mode() -> bool:
+    return ORDERING_MODE == "rank"
+
+
+# ===== RENUMÉROTATION DES PRIORITÉS =====
+
+def renumber_statement(todolist_id: int):
+    """UPDATE ... FROM (ROW_NUMBER() OVER ...) : actifs en premier, puis terminés"""
+    ranked = select(
+        models.Todo.id.label("id"),
+        func.row_number().over(
+            order_by=(
+                models.Todo.completed.asc(),
+                models.Todo.priority.asc(),
+                models.Todo.created_at.desc(),
+                models.Todo.id.desc()
+            )
+        ).label("new_priority")
+    ).where(models.Todo.todolist_id == todolist_id).subquery()
+
+    return (
+        update(models.Todo)
+        .where(models.Todo.id == ranked.c.id)
+        .where(models.Todo.priority.is_distinct_from(ranked.c.new_priority))
+        .values(priority=ranked.c.new_priority)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def renumber_priorities(db: Session, todolist_id: int) -> int:
+    """Renumérote une TodoList en une seule requête.
+
+    Seules les lignes dont la priorité change sont écrites ; retourne leur nombre.
+    """
+    return db.execute(renumber_statement(todolist_id)).rowcount
+
+
+def recalculate_priorities(db: Session, todolist_id: int) -> int:
+    """Recalcule toutes les priorités d'une TodoList et commit si des lignes ont bougé"""
+    changed = renumber_priorities(db, todolist_id)
+    if changed:
+        # Le commit expire les objets chargés, qui relisent leur nouvelle priorité
+        db.commit()
+    return changed
+
+
+def bulk_priorities_statement(new_priorities: Dict[int, int]):
+    """UPDATE ... SET priority = CASE id WHEN ... END pour tous les ids fournis"""
+    return (
+        update(models.Todo)
+        .where(models.Todo.id.in_(list(new_priorities)))
+        .values(priority=case(new_priorities, value=models.Todo.id))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def write_priorities(db: Session, new_priorities: Dict[int, int]) -> int:
+    """Écrit toutes les nouvelles priorités en une seule requête ; retourne le nombre de lignes écrites"""
+    if not new_priorities:
+        return 0
+    return db.execute(bulk_priorities_statement(new_priorities)).rowcount
+
+
+def toggle_with_shift(db: Session, todo: models.Todo) -> None:
+    """Inverse le statut du todo en ne décalant que la plage entre sa position et la frontière actifs/terminés.
+
+    Un todo terminé devient le dernier actif, un todo actif devient le premier terminé.
+    Si la liste n'est pas numérotée de façon continue, on retombe sur une renumérotation complète.
+    """
+    total, active_count, lowest, highest = db.query(
+        func.count(models.Todo.id),
+        func.coalesce(func.sum(case((models.Todo.completed == False, 1), else_=0)), 0),
+        func.min(models.Todo.priority),
+        func.max(models.Todo.priority)
+    ).filter(models.Todo.todolist_id == todo.todolist_id).one()
+
+    position = todo.priority
+    was_completed = bool(todo.completed)
+    todo.completed = not was_completed
+
+    in_expected_group = position > active_count if was_completed else position <= active_count
+    if position is None or lowest != 1 or highest != total or not in_expected_group:
+        db.flush()
+        renumber_priorities(db, todo.todolist_id)
+        return
+
+    if was_completed:
+        # Terminé -> actif : les terminés placés avant lui descendent d'un cran
+        target = active_count + 1
+        shifted_range = (models.Todo.priority >= target, models.Todo.priority < position)
+        delta = 1
+    else:
+        # Actif -> terminé : les actifs placés après lui remontent d'un cran
+        target = active_count
+        shifted_range = (models.Todo.priority > position, models.Todo.priority <= target)
+        delta = -1
+
+    if target != position:
+        db.query(models.Todo).filter(
+            models.Todo.todolist_id == todo.todolist_id,
+            models.Todo.id != todo.id,
+            *shifted_range
+        ).update({models.Todo.priority: models.Todo.priority + delta}, synchronize_session=False)
+        todo.priority = target
+
+
+# ===== CLÉS FRACTIONNAIRES =====
+
+def _shift(key: str, delta: int) -> Optional[str]:
+    """Ajoute `delta` (+1/-1) au dernier chiffre de la clé, à largeur fixe ; None en cas de débordement"""
+    digits = [RANK_ALPHABET.index(char) for char in key.ljust(RANK_SHIFT_WIDTH, "0")]
+    index = len(digits) - 1
+    while index >= 0:
+        value = digits[index] + delta
+        if 0 <= value < RANK_BASE:
+            digits[index] = value
+            break
+        digits[index] = value % RANK_BASE
+        index -= 1
+    else:
+        return None
+
+    shifted = "".join(RANK_ALPHABET[digit] for digit in digits).rstrip("0")
+    return shifted or None
+
+
+def rank_between(before: Optional[str], after: Optional[str]) -> str:
+    """Retourne une clé strictement comprise entre `before` et `after` (None = borne ouverte)"""
+    if before is not None and after is not None and before >= after:
+        raise ValueError(f"Invalid rank interval: {before!r} >= {after!r}")
+    if after == "":
+        raise ValueError("Invalid rank interval: empty upper bound")
+
+    # Ajout en fin / en tête : on incrémente à largeur constante pour que les clés ne s'allongent pas
+    if before is not None and after is None:
+        shifted = _shift(before, 1)
+        if shifted is not None:
+            return shifted
+    if before is None and after is not None:
+        shifted = _shift(after, -1)
+        if shifted is not None:
+            return shifted
+
+    low = before or ""
+    high = after
+    result = []
+    index = 0
+
+    while True:
+        low_digit = RANK_ALPHABET.index(low[index]) if index < len(low) else 0
+        if high is None:
+            high_digit = RANK_BASE
+        else:
+            high_digit = RANK_ALPHABET.index(high[index]) if index < len(high) else 0
+
+        if low_digit == high_digit:
+            result.append(RANK_ALPHABET[low_digit])
+            index += 1
+            continue
+
+        middle = (low_digit + high_digit) // 2
+        if middle > low_digit:
+            result.append(RANK_ALPHABET[middle])
+            return "".join(result)
+
+        # Chiffres consécutifs : on garde celui du bas et on continue sans borne haute
+        result.append(RANK_ALPHABET[low_digit])
+        index += 1
+        high = None
+
+
+def rank_sequence(count: int) -> List[str]:
+    """Génère `count` clés régulièrement espacées (utilisé pour le backfill et le rééquilibrage).
+
+    Les clés occupent la moitié centrale de l'espace pour laisser de la marge aux ajouts en tête et en fin.
+    """
+    if count <= 0:
+        return []
+
+    width = 1
+    while RANK_BASE ** width <= count + 1:
+        width += 1
+    width += 1  # Marge pour les insertions futures
+    space = RANK_BASE ** width
+    start = space // 4
+    step = (space // 2) // (count + 1)
+
+    keys = []
+    for index in range(1, count + 1):
+        value = start + index * step
+        digits = []
+        for _ in range(width):
+            value, digit = divmod(value, RANK_BASE)
+            digits.append(RANK_ALPHABET[digit])
+        keys.append("".join(reversed(digits)).rstrip("0"))
+    return keys
+
+
+# ===== OPÉRATIONS SUR UNE TODOLIST =====
+
+def rebalance_ranks(db: Session, todolist_id: int) -> int:
+    """Réattribue des clés régulièrement espacées à toute la liste (passe occasionnelle)"""
+    todos = db.query(models.Todo).filter(
+        models.Todo.todolist_id == todolist_id
+    ).order_by(
+        models.Todo.completed.asc(),
+        models.Todo.rank.is_(None).asc(),
+        models.Todo.rank.asc(),
+        models.Todo.priority.asc(),
+        models.Todo.id.asc()
+    ).all()
+
+    for todo, key in zip(todos, rank_sequence(len(todos))):
+        todo.rank = key
+
+    db.flush()
+    return len(todos)
+
+
+def ensure_ranks(db: Session, todolist_id: int) -> None:
+    """Backfill paresseux : une liste contenant des todos sans clé est rééquilibrée une fois"""
+    missing = db.query(models.Todo.id).filter(
+        models.Todo.todolist_id == todolist_id,
+        models.Todo.rank.is_(None)
+    ).first()
+    if missing:
+        rebalance_ranks(db, todolist_id)
+
+
+def _group_query(db: Session, todolist_id: int, completed: bool, exclude_id: Optional[int]):
+    query = db.query(models.Todo.rank).filter(
+        models.Todo.todolist_id == todolist_id,
+        models.Todo.completed == completed
+    )
+    if exclude_id is not None:
+        query = query.filter(models.Todo.id != exclude_id)
+    return query
+
+
+def rank_for_position(
+    db: Session,
+    todolist_id: int,
+    completed: bool,
+    position: Optional[int] = None,
+    exclude_id: Optional[int] = None
+) -> str:
+    """Calcule la clé d'un todo placé à `position` (1-based) dans son groupe actif/terminé.
+
+    Sans position, le todo est placé à la fin de son groupe.
+    """
+    ensure_ranks(db, todolist_id)
+    group = _group_query(db, todolist_id, completed, exclude_id)
+
+    if position is None:
+        last = group.order_by(models.Todo.rank.desc()).first()
+        return rank_between(last.rank if last else None, None)
+
+    offset = max(position - 1, 0)
+    if offset == 0:
+        first = group.order_by(models.Todo.rank.asc()).first()
+        return rank_between(None, first.rank if first else None)
+
+    # Voisins immédiats : (offset - 1) et offset
+    neighbours = group.order_by(models.Todo.rank.asc()).offset(offset - 1).limit(2).all()
+    if not neighbours:
+        last = group.order_by(models.Todo.rank.desc()).first()
+        return rank_between(last.rank if last else None, None)
+    before = neighbours[0].rank
+    after = neighbours[1].rank if len(neighbours) > 1 else None
+    return rank_between(before, after)
+
+
+def place_todo(db: Session, todo: models.Todo, position: Optional[int] = None) -> None:
+    """Attribue une clé au todo (une seule ligne écrite), rééquilibre si les clés deviennent trop longues"""
+    todo.rank = rank_for_position(
+        db, todo.todolist_id, bool(todo.completed), position, exclude_id=todo.id
+    )
+    db.flush()
+    if len(todo.rank) > RANK_MAX_LENGTH:
+        rebalance_ranks(db, todo.todolist_id)
+
+
+def position_of(db: Session, todo: models.Todo) -> int:
+    """Position 1-based du todo dans sa liste : actifs d'abord, puis terminés, par clé"""
+    completed = bool(todo.completed)
+    same_group_before = and_(
+        models.Todo.completed == completed,
+        models.Todo.rank < todo.rank
+    )
+    condition = same_group_before
+    if completed:
+        condition = or_(models.Todo.completed == False, same_group_before)
+
+    before = db.query(func.count(models.Todo.id)).filter(
+        models.Todo.todolist_id == todo.todolist_id,
+        condition
+    ).scalar()
+    return before + 1
+
+
+def apply_position(db: Session, todo: models.Todo) -> models.Todo:
+    """Expose la position dérivée dans `priority` sans marquer l'objet comme modifié"""
+    if is_rank_mode() and todo.rank is not None:
+        set_committed_value(todo, "priority", position_of(db, todo))
+    return todo
+
+
+def apply_positions(todos: Iterable[models.Todo]) -> List[models.Todo]:
+    """Trie les todos (par liste, actifs puis terminés, par clé) et expose leur position dans `priority`"""
+    todos = list(todos)
+    if not is_rank_mode():
+        return todos
+
+    todos.sort(key=lambda t: (t.todolist_id, bool(t.completed), t.rank is None, t.rank or "", t.priority or 0, t.id))
+    current_list = None
+    position = 0
+    for todo in todos:
+        if todo.todolist_id != current_list:
+            current_list = todo.todolist_id
+            position = 0
+        position += 1
+        set_committed_value(todo, "priority", position)
+    return todos
+
+
+def position_column():
+    """Expression SQL de la position affichée : priorité stockée, ou dérivée des clés en mode rank"""
+    if not is_rank_mode():
+        return models.Todo.priority
+    return func.row_number().over(
+        partition_by=models.Todo.todolist_id,
+        order_by=(
+            models.Todo.completed.asc(),
+            models.Todo.rank.is_(None).asc(),
+            models.Todo.rank.asc(),
+            models.Todo.priority.asc(),
+            models.Todo.id.asc()
+        )
+    )
+
+
+def next_ranks(db: Session, todolist_id: int, completed: bool, count: int) -> List[str]:
+    """Clés pour ajouter `count` todos à la fin d'un groupe, sans relire la liste entre chaque ajout"""
+    ensure_ranks(db, todolist_id)
+    last = _group_query(db, todolist_id, completed, None).order_by(models.Todo.rank.desc()).first()
+    previous = last.rank if last else None
+
+    keys = []
+    for _ in range(count):
+        previous = rank_between(previous, None)
+        keys.append(previous)
+    return keys
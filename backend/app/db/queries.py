@@ -0,0 +1,34 @@
+from sqlalchemy.orm import Query, Session, joinedload, selectinload
+
+from app.db import models
+
+# Les relations sont déclarées en lazy="raise_on_sql" : chaque lecture précise ici
+# ce qu'elle charge, un chargement paresseux oublié lève une erreur au lieu de coûter N requêtes.
+
+
+def todolist_query(db: Session) -> Query:
+    """TodoLists avec leurs todos (selectin) et leur catégorie (jointure)"""
+    return db.query(models.TodoList).options(
+        selectinload(models.TodoList.todos),
+        joinedload(models.TodoList.category)
+    )
+
+
+def todolist_with_category_query(db: Session) -> Query:
+    """TodoLists avec leur catégorie, sans les todos"""
+    return db.query(models.TodoList).options(joinedload(models.TodoList.category))
+
+
+def todo_query(db: Session) -> Query:
+    """Todos avec leur TodoList et la catégorie de celle-ci (jointures)"""
+    return db.query(models.Todo).options(
+        joinedload(models.Todo.todolist).joinedload(models.TodoList.category)
+    )
+
+
+def link_query(db: Session) -> Query:
+    """Liens avec leurs TodoLists parent / enfant et leurs catégories"""
+    return db.query(models.Link).options(
+        joinedload(models.Link.parent_todolist).joinedload(models.TodoList.category),
+        joinedload(models.Link.child_todolist).joinedload(models.TodoList.category)
+    )
@@ -0,0 +1,89 @@
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, literal, literal_column, select, table, column
+from sqlalchemy.orm import Session
+
+from app.db import models, ordering, queries
+from app.db.text import normalize_name, search_terms
+from app.pagination import keyset_page
+from app.schemas import TodoFilter
+
+# Table FTS5 (SQLite), déclarée dans app.db.models
+todos_fts = table("todos_fts", column("rowid"), column("search_name"))
+
+
+def _fts5_query(terms: List[str]) -> str:
+    """Tous les mots, chacun en préfixe : "tom" trouve "tomates" """
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _tsquery(terms: List[str]) -> str:
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+def _ranked_ids(db: Session, terms: List[str]):
+    """Sélection (id, score) des todos correspondant aux mots ; score croissant = plus pertinent"""
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "sqlite":
+        return (
+            select(models.Todo.id.label("id"), func.bm25(literal_column("todos_fts")).label("score"))
+            .select_from(todos_fts)
+            .join(models.Todo, models.Todo.id == todos_fts.c.rowid)
+            .where(literal_column("todos_fts").op("MATCH")(_fts5_query(terms)))
+        )
+
+    if dialect == "postgresql":
+        phrase = " ".join(terms)
+        tsvector = func.to_tsvector("simple", func.coalesce(models.Todo.search_name, ""))
+        tsquery = func.to_tsquery("simple", _tsquery(terms))
+        relevance = func.ts_rank(tsvector, tsquery) + func.similarity(models.Todo.search_name, phrase)
+        return (
+            select(models.Todo.id.label("id"), (-relevance).label("score"))
+            # Préfixes exacts (GIN tsvector) ou noms proches malgré une faute de frappe (GIN trigrammes)
+            .where(tsvector.op("@@")(tsquery) | models.Todo.search_name.op("%")(phrase))
+        )
+
+    # Autres bases : sous-chaînes, sans classement
+    query = select(models.Todo.id.label("id"), literal(0.0).label("score"))
+    for term in terms:
+        query = query.where(models.Todo.search_name.contains(term, autoescape=True))
+    return query
+
+
+def search_todos(
+    db: Session,
+    filters: TodoFilter,
+    todolist_id: Optional[int],
+    limit: int,
+    cursor: Optional[str]
+) -> Tuple[List[models.Todo], Optional[str]]:
+    """Recherche classée et paginée (curseur sur (score, id)) ; retourne les todos et le curseur suivant"""
+    terms = search_terms(filters.search) if filters.search else []
+    if terms:
+        candidates = _ranked_ids(db, terms)
+    else:
+        candidates = select(models.Todo.id.label("id"), literal(0.0).label("score"))
+
+    if filters.completed is not None:
+        candidates = candidates.where(models.Todo.completed == filters.completed)
+    if todolist_id is not None:
+        candidates = candidates.where(models.Todo.todolist_id == todolist_id)
+    if filters.priority is not None:
+        # Position affichée : colonne priority, ou dérivée des clés en mode rank
+        positions = select(models.Todo.id.label("id"), ordering.position_column().label("position"))
+        if todolist_id is not None:
+            positions = positions.where(models.Todo.todolist_id == todolist_id)
+        positions = positions.subquery()
+        candidates = candidates.where(
+            models.Todo.id.in_(select(positions.c.id).where(positions.c.position == filters.priority))
+        )
+
+    ranked = candidates.subquery()
+    rows, next_cursor = keyset_page(
+        db.query(ranked.c.id, ranked.c.score), (ranked.c.score, ranked.c.id), limit, cursor
+    )
+
+    ids = [row.id for row in rows]
+    todos_by_id = {todo.id: todo for todo in queries.todo_query(db).filter(models.Todo.id.in_(ids))}
+    return [ordering.apply_position(db, todos_by_id[todo_id]) for todo_id in ids], next_cursor
@@ -0,0 +1,171 @@
+import os
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from app.db import models, ordering
+from app.schemas import DayActivity, GlobalStats, TodoListStats, TodoStats
+
+# Cache optionnel des statistiques, en secondes (0 : désactivé)
+STATS_CACHE_TTL = float(os.getenv("STATS_CACHE_TTL", "0"))
+
+_cache: Dict[Tuple, Tuple[float, object]] = {}
+
+
+def clear_cache() -> None:
+    _cache.clear()
+
+
+def _cached(key: Tuple, compute: Callable[[], object]):
+    """Sert une valeur calculée depuis moins de STATS_CACHE_TTL secondes, sinon la recalcule"""
+    if STATS_CACHE_TTL <= 0:
+        return compute()
+
+    now = time.monotonic()
+    hit = _cache.get(key)
+    if hit is not None and hit[0] > now:
+        return hit[1]
+
+    value = compute()
+    _cache[key] = (now + STATS_CACHE_TTL, value)
+    return value
+
+
+def _completion_rate(completed: int, total: int) -> float:
+    return round(completed / total * 100, 1) if total else 0.0
+
+
+def _positions(todolist_id: Optional[int] = None):
+    """Sous-requête (todolist_id, completed, position) : la position suit le mode d'ordonnancement"""
+    query = select(
+        models.Todo.todolist_id.label("todolist_id"),
+        models.Todo.completed.label("completed"),
+        ordering.position_column().label("position"),
+    )
+    if todolist_id is not None:
+        query = query.where(models.Todo.todolist_id == todolist_id)
+    return query.subquery()
+
+
+def _priority_distributions(db: Session, todolist_id: Optional[int] = None) -> Tuple[Dict[int, int], Dict[int, int]]:
+    """Nombre de todos (et de todos terminées) par priorité, en une requête GROUP BY"""
+    positions = _positions(todolist_id)
+    rows = db.execute(
+        select(
+            positions.c.position,
+            func.count().label("total"),
+            func.sum(case((positions.c.completed == True, 1), else_=0)).label("completed"),
+        )
+        .group_by(positions.c.position)
+        .order_by(positions.c.position)
+    ).all()
+    return (
+        {row.position: row.total for row in rows},
+        {row.position: row.completed or 0 for row in rows},
+    )
+
+
+def _list_rows(db: Session, todolist_id: Optional[int] = None):
+    """Compteurs par TodoList, lus dans les colonnes dénormalisées (aucun parcours des todos)"""
+    query = (
+        select(
+            models.TodoList.id,
+            models.TodoList.name,
+            models.TodoList.total_count.label("total"),
+            models.TodoList.completed_count.label("completed"),
+        )
+        .order_by(models.TodoList.id)
+    )
+    if todolist_id is not None:
+        query = query.where(models.TodoList.id == todolist_id)
+    return db.execute(query).all()
+
+
+def _priority_sum(total: int) -> int:
+    # Les positions d'une liste sont continues (1..n) : leur somme se déduit du total
+    return total * (total + 1) // 2
+
+
+def _list_stats(row, distribution: Dict[int, int], completed_distribution: Dict[int, int]) -> TodoListStats:
+    return TodoListStats(
+        todolist_id=row.id,
+        name=row.name,
+        total_todos=row.total,
+        completed_todos=row.completed,
+        pending_todos=row.total - row.completed,
+        completion_rate=_completion_rate(row.completed, row.total),
+        average_priority=round(_priority_sum(row.total) / row.total, 1) if row.total else 0.0,
+        priority_distribution=distribution,
+        completed_priority_distribution=completed_distribution,
+    )
+
+
+def todolist_stats(db: Session, todolist_id: int) -> Optional[TodoListStats]:
+    """Statistiques d'une TodoList ; None si elle n'existe pas"""
+    def compute():
+        rows = _list_rows(db, todolist_id)
+        if not rows:
+            return None
+        return _list_stats(rows[0], *_priority_distributions(db, todolist_id))
+
+    return _cached(("todolist", todolist_id, ordering.ORDERING_MODE), compute)
+
+
+def global_stats(db: Session) -> GlobalStats:
+    """Statistiques globales et par TodoList : deux requêtes, quel que soit le volume.
+
+    Le détail par TodoList n'inclut pas les distributions de priorités (voir `todolist_stats`).
+    """
+    def compute():
+        rows = _list_rows(db)
+        distribution, completed_distribution = _priority_distributions(db)
+
+        total = sum(row.total for row in rows)
+        completed = sum(row.completed for row in rows)
+        priority_sum = sum(_priority_sum(row.total) for row in rows)
+        return GlobalStats(
+            total_todos=total,
+            completed_todos=completed,
+            pending_todos=total - completed,
+            completion_rate=_completion_rate(completed, total),
+            average_priority=round(priority_sum / total, 1) if total else 0.0,
+            priority_distribution=distribution,
+            completed_priority_distribution=completed_distribution,
+            total_lists=len(rows),
+            todolists=[_list_stats(row, {}, {}) for row in rows],
+        )
+
+    return _cached(("global", ordering.ORDERING_MODE), compute)
+
+
+def timeseries(db: Session, start: date, end: date, todolist_id: Optional[int] = None) -> List[DayActivity]:
+    """Activité jour par jour entre deux dates incluses, lue dans la table d'agrégats uniquement.
+
+    Les jours sans activité sont renvoyés à zéro.
+    """
+    query = (
+        select(
+            models.DailyActivity.day,
+            func.sum(models.DailyActivity.created).label("created"),
+            func.sum(models.DailyActivity.completed).label("completed"),
+        )
+        .where(models.DailyActivity.day >= start, models.DailyActivity.day <= end)
+        .group_by(models.DailyActivity.day)
+    )
+    if todolist_id is not None:
+        query = query.where(models.DailyActivity.todolist_id == todolist_id)
+    rows = {row.day: row for row in db.execute(query)}
+
+    days = []
+    for offset in range((end - start).days + 1):
+        day = start + timedelta(days=offset)
+        row = rows.get(day)
+        days.append(DayActivity(
+            date=day,
+            created=row.created if row else 0,
+            completed=max(row.completed, 0) if row else 0,
+        ))
+    return days
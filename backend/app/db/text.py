@@ -0,0 +1,23 @@
+import re
+import unicodedata
+from typing import List
+
+# Ligatures françaises que la décomposition Unicode ne sépare pas
+_LIGATURES = str.maketrans({"œ": "oe", "æ": "ae"})
+
+_WORD = re.compile(r"\w+")
+
+
+def normalize_name(name: str) -> str:
+    """Forme de recherche d'un nom : sans accents ni ligatures, en minuscules, espaces réduits.
+
+    "Crème brûlée" et "CREME  BRULEE" donnent toutes deux "creme brulee".
+    """
+    decomposed = unicodedata.normalize("NFKD", name or "")
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().translate(_LIGATURES).split())
+
+
+def search_terms(text: str) -> List[str]:
+    """Mots normalisés d'une recherche, sans ponctuation (sûrs pour FTS5 et to_tsquery)"""
+    return _WORD.findall(normalize_name(text))
@@ -1,15 +1,30 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.routes import todos, todolists, categories
-from app.db.session import engine
+from app import suggestions
+from app.routes import todos, todolists, categories, stats
+from app.db.session import SessionLocal, engine
 from app.db.models import Base
 
 # Créer les tables
 Base.metadata.create_all(bind=engine)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Index des suggestions construit au démarrage, puis mis à jour à chaque insertion
+    db = SessionLocal()
+    try:
+        suggestions.index.load(db)
+    finally:
+        db.close()
+    yield
+
+
 # FastAPI app
-app = FastAPI(title="Todo List API", version="1.0.0")
+app = FastAPI(title="Todo List API", version="1.0.0", lifespan=lifespan)
 
 # Configuration CORS
 app.add_middleware(
@@ -18,11 +33,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "Link"],
 )
 
 app.include_router(todos.router, prefix="/todos", tags=["todos"])
 app.include_router(todolists.router, prefix="/todolists", tags=["todolists"])
 app.include_router(categories.router, prefix="/categories", tags=["categories"])
+app.include_router(stats.router, prefix="/stats", tags=["stats"])
 
 # Route de test optionnelle
 @app.get("/")
@@ -0,0 +1,64 @@
+import base64
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Curseur opaque : valeurs de tri du dernier élément, encodées en base64 url-safe"""
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Décode un curseur ; lève une 400 s'il est invalide"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        values = None
+
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return values
+
+
+def keyset_page(query: Query, columns: Sequence, limit: Optional[int], cursor: Optional[str]) -> Tuple[list, Optional[str]]:
+    """Pagination par clé : WHERE (colonnes) > (curseur) ORDER BY colonnes LIMIT n.
+
+    Le coût d'une page ne dépend pas de sa position dans la table. La requête doit
+    sélectionner des entités ou des lignes exposant chaque colonne de tri par son nom.
+    Sans limite, toutes les lignes après le curseur sont renvoyées.
+    """
+    if cursor is not None:
+        query = query.filter(tuple_(*columns) > tuple_(*decode_cursor(cursor, len(columns))))
+
+    if limit is None:
+        return query.order_by(*columns).all(), None
+
+    # Une ligne de plus pour savoir s'il reste une page
+    rows = query.order_by(*columns).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, column.key) for column in columns])
+
+
+def set_next_cursor(request: Request, response: Response, next_cursor: Optional[str]) -> None:
+    """Expose le curseur suivant dans `X-Next-Cursor` et un en-tête `Link` rel="next" """
+    if next_cursor is None:
+        return
+    response.headers["X-Next-Cursor"] = next_cursor
+    next_url = request.url.include_query_params(cursor=next_cursor)
+    response.headers["Link"] = f'<{next_url}>; rel="next"'
@@ -0,0 +1,44 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from app.schemas import DayActivity, GlobalStats
+from app.db import stats
+from app.db.session import get_db
+
+router = APIRouter()
+
+# Nombre maximal de jours renvoyés par /stats/timeseries
+MAX_TIMESERIES_DAYS = 366
+
+
+@router.get("/", response_model=GlobalStats)
+def get_stats(db: Session = Depends(get_db)):
+    """Statistiques globales (totaux, taux de completion, priorités, détail par TodoList)"""
+    return stats.global_stats(db)
+
+
+@router.get("/timeseries", response_model=List[DayActivity])
+def get_stats_timeseries(
+    start: Optional[date] = Query(None, alias="from"),
+    end: Optional[date] = Query(None, alias="to"),
+    todolist_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """Todos créées / terminées par jour (UTC), bornes incluses ; 7 derniers jours par défaut"""
+    end = end or datetime.now(timezone.utc).date()
+    start = start or end - timedelta(days=6)
+
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'from' must be before 'to'"
+        )
+    if (end - start).days >= MAX_TIMESERIES_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range cannot exceed {MAX_TIMESERIES_DAYS} days"
+        )
+
+    return stats.timeseries(db, start, end, todolist_id)
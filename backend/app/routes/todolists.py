@@ -1,52 +1,106 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from app.schemas import TodoList, TodoListCreate, Todo, TodoCreate, TodoListUpdate, Link
-from app.db import models
+from app.schemas import TodoList, TodoListCreate, Todo, TodoCreate, TodoListUpdate, Link, TodoListSummary, TodoListStats
+from app.db import locking, models, ordering, queries, stats
+from app.db.ordering import recalculate_priorities
 from app.db.session import get_db
+from app.pagination import MAX_PAGE_SIZE, keyset_page, set_next_cursor
 from typing import List, Optional
 from sqlalchemy.exc import IntegrityError
 
 router = APIRouter()
 
-def recalculate_priorities(db: Session, todolist_id: int):
-    """Recalcule toutes les priorités d'une TodoList : actifs en premier, puis terminés"""
-    
-    # Récupérer tous les todos actifs (non terminés) triés par priorité
-    active_todos = db.query(models.Todo).filter(
-        models.Todo.todolist_id == todolist_id,
-        models.Todo.completed == False
-    ).order_by(models.Todo.priority.asc(),
-            models.Todo.created_at.desc()).all()
-    
-    # Récupérer tous les todos terminés triés par priorité
-    completed_todos = db.query(models.Todo).filter(
-        models.Todo.todolist_id == todolist_id,
-        models.Todo.completed == True
-    ).order_by(models.Todo.priority.asc(),
-            models.Todo.created_at.desc()).all()
-    
-    # Renuméroter les todos actifs : 1, 2, 3...
-    for index, todo in enumerate(active_todos, 1):
-        todo.priority = index
-    
-    # Renuméroter les todos terminés : après les actifs
-    start_priority = len(active_todos) + 1
-    for index, todo in enumerate(completed_todos, start_priority):
-        todo.priority = index
-    
+def _finalize_appended_todos(db: Session, todolist_id: int, new_todos: List[models.Todo]):
+    """Commit des todos ajoutés en fin de liste (actifs) selon le mode d'ordonnancement"""
+    if ordering.is_rank_mode():
+        for new_todo, key in zip(new_todos, ordering.next_ranks(db, todolist_id, False, len(new_todos))):
+            new_todo.rank = key
+    else:
+        db.flush()
+        ordering.renumber_priorities(db, todolist_id)
+    db.commit()
+
+def _reorder_by_rank(db: Session, todolist_id: int, todo_ids: List[int]):
+    """Réordonne en mode rank : les clés existantes sont redistribuées dans l'ordre fourni"""
+    ordering.ensure_ranks(db, todolist_id)
+
+    todos_by_id = {
+        todo.id: todo for todo in db.query(models.Todo).filter(
+            models.Todo.id.in_(todo_ids),
+            models.Todo.todolist_id == todolist_id
+        ).all()
+    }
+    keys = sorted(todo.rank for todo in todos_by_id.values())
+    for todo_id, key in zip(todo_ids, keys):
+        todos_by_id[todo_id].rank = key
     db.commit()
-    return len(active_todos) + len(completed_todos)
+
+def _filter_todolists(query, category_id: Optional[int]):
+    """Filtres communs à la liste complète et au résumé des TodoLists"""
+    if category_id is not None:
+        query = query.filter(models.TodoList.category_id == category_id)
+    return query
 
 @router.get("/", response_model=List[TodoList])
-def get_todolists(db: Session = Depends(get_db)):
-    """Récupérer toutes les TodoLists"""
-    return db.query(models.TodoList).all()
+def get_todolists(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    category_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """Récupérer les TodoLists, paginées par curseur sur l'id si `limit` est fourni"""
+    query = _filter_todolists(queries.todolist_query(db), category_id)
+    todolists, next_cursor = keyset_page(query, (models.TodoList.id,), limit, cursor)
+    set_next_cursor(request, response, next_cursor)
+    ordering.apply_positions(todo for todolist in todolists for todo in todolist.todos)
+    return todolists
+
+@router.get("/summary", response_model=List[TodoListSummary])
+def get_todolists_summary(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    category_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """Résumé des TodoLists (nom, catégorie, compteurs), lu dans les compteurs dénormalisés"""
+    query = (
+        db.query(
+            models.TodoList.id,
+            models.TodoList.name,
+            models.TodoList.category_id,
+            models.Category,
+            models.TodoList.total_count.label("total"),
+            models.TodoList.completed_count.label("completed"),
+        )
+        .outerjoin(models.Category, models.Category.id == models.TodoList.category_id)
+    )
+    rows, next_cursor = keyset_page(
+        _filter_todolists(query, category_id), (models.TodoList.id,), limit, cursor
+    )
+    set_next_cursor(request, response, next_cursor)
+
+    return [
+        TodoListSummary(
+            id=row.id,
+            name=row.name,
+            category_id=row.category_id,
+            category=row.Category,
+            total=row.total,
+            completed=row.completed,
+            pending=row.total - row.completed,
+        )
+        for row in rows
+    ]
 
 @router.get("/links/all", response_model=List[Link])  
 def get_all_todolist_links(db: Session = Depends(get_db)):
     """Récupérer toutes les relations entre les TodoLists"""
-    return db.query(models.Link).all()
+    return queries.link_query(db).all()
 
 
 @router.post("/", response_model=TodoList)
@@ -65,6 +119,7 @@ def create_todolist(todolist: TodoListCreate, db: Session = Depends(get_db)):
 
         # Ajouter les todos si fournis
         if todolist.todos:
+            new_todos = []
             for index, todo_data in enumerate(todolist.todos, 1):
                 # Assigner les priorités automatiquement : 1, 2, 3...
                 final_priority = todo_data.priority if todo_data.priority is not None else index
@@ -77,13 +132,22 @@ def create_todolist(todolist: TodoListCreate, db: Session = Depends(get_db)):
                     todolist_id=db_todolist.id
                 )
                 db.add(db_todo)
+                new_todos.append((final_priority, index, db_todo))
             
-            db.commit()
-            
-            # Recalculer les priorités pour s'assurer de la cohérence
-            recalculate_priorities(db, db_todolist.id)
-            db.refresh(db_todolist)
+            if ordering.is_rank_mode():
+                # Liste neuve : les clés sont attribuées avant l'insertion, aucune renumérotation
+                new_todos.sort(key=lambda item: (item[0], item[1]))
+                for (_, _, db_todo), key in zip(new_todos, ordering.rank_sequence(len(new_todos))):
+                    db_todo.rank = key
+                db.commit()
+            else:
+                db.commit()
+                
+                # Recalculer les priorités pour s'assurer de la cohérence
+                recalculate_priorities(db, db_todolist.id)
         
+        db_todolist = queries.todolist_query(db).filter(models.TodoList.id == db_todolist.id).one()
+        ordering.apply_positions(db_todolist.todos)
         return db_todolist
         
     except IntegrityError as e:
@@ -100,25 +164,34 @@ def create_todolist(todolist: TodoListCreate, db: Session = Depends(get_db)):
         )
 
 @router.get("/{todolist_id}", response_model=TodoList)  
-def get_todolist(todolist_id: int, db: Session = Depends(get_db)):
+def get_todolist(todolist_id: int, response: Response, db: Session = Depends(get_db)):
     """Récupérer une TodoList par ID"""
-    todolist = db.query(models.TodoList).filter(models.TodoList.id == todolist_id).first()
+    todolist = queries.todolist_query(db).filter(models.TodoList.id == todolist_id).first()
     if not todolist:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, 
             detail="Todolist not found"
         )
+    locking.set_etag(response, todolist)
+    ordering.apply_positions(todolist.todos)
     return todolist
       
 @router.put("/{todolist_id}", response_model=TodoList)
-def update_todolist(todolist_id: int, todolist_update: TodoListUpdate, db: Session = Depends(get_db)):
+def update_todolist(
+    todolist_id: int,
+    todolist_update: TodoListUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
     """Mettre à jour une TodoList"""
-    db_todolist = db.query(models.TodoList).filter(models.TodoList.id == todolist_id).first()
+    db_todolist = locking.acquire_todolist(db, todolist_id, if_match)
     if not db_todolist:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, 
             detail="TodoList not found"
         )
+    locking.set_etag(response, db_todolist)
     
     try:
         # Mettre à jour uniquement les champs fournis
@@ -129,7 +202,8 @@ def update_todolist(todolist_id: int, todolist_update: TodoListUpdate, db: Sessi
             db_todolist.category_id = todolist_update.category_id
         
         db.commit()
-        db.refresh(db_todolist)
+        db_todolist = queries.todolist_query(db).filter(models.TodoList.id == todolist_id).one()
+        ordering.apply_positions(db_todolist.todos)
         return db_todolist
         
     except IntegrityError as e:
@@ -146,16 +220,23 @@ def update_todolist(todolist_id: int, todolist_update: TodoListUpdate, db: Sessi
         )
 
 @router.post("/{todolist_id}/todos", response_model=Todo)
-def add_todo_to_list(todolist_id: int, todo: TodoCreate, db: Session = Depends(get_db)):
+def add_todo_to_list(
+    todolist_id: int,
+    todo: TodoCreate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
     """Ajouter une nouvelle todo à une TodoList"""
     
-    # Vérifier que la todolist existe
-    todolist = db.query(models.TodoList).filter(models.TodoList.id == todolist_id).first()
+    # Vérifier que la todolist existe et sérialiser les écritures sur celle-ci
+    todolist = locking.acquire_todolist(db, todolist_id, if_match)
     if not todolist:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, 
             detail="TodoList not found"        
         )
+    locking.set_etag(response, todolist)
     
     try:
         # Si priorité fournie on l'applique, sinon la todo sera la dernère de la liste, recalculate_priorities() rénumérotera
@@ -173,12 +254,20 @@ def add_todo_to_list(todolist_id: int, todo: TodoCreate, db: Session = Depends(g
             todolist_id=todolist_id
         )
 
+        if ordering.is_rank_mode():
+            # Une seule ligne écrite : la clé place directement le todo
+            db.add(db_todo)
+            ordering.place_todo(db, db_todo, todo.priority if todo.priority and todo.priority > 0 else None)
+            db.commit()
+            db_todo = queries.todo_query(db).filter(models.Todo.id == db_todo.id).one()
+            return ordering.apply_position(db, db_todo)
+
         db.add(db_todo)
+        db.flush()
+        ordering.renumber_priorities(db, todolist_id)
         db.commit()
         
-        recalculate_priorities(db, todolist_id)
-        
-        db.refresh(db_todo)
+        db_todo = queries.todo_query(db).filter(models.Todo.id == db_todo.id).one()
         
         print(f"✅ Todo créée et priorité recalculée: {db_todo.priority}")
         
@@ -193,43 +282,68 @@ def add_todo_to_list(todolist_id: int, todo: TodoCreate, db: Session = Depends(g
         )
 
 @router.put("/{todolist_id}/todos/reorder")
-def reorder_todos(todolist_id: int, todo_ids: List[int], db: Session = Depends(get_db)):
-    """Réorganise les todos selon l'ordre fourni"""
+def reorder_todos(
+    todolist_id: int,
+    todo_ids: List[int],
+    response: Response,
+    diff: bool = False,
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Réorganise les todos selon l'ordre fourni
+
+    En mode `diff`, seules les todos dont la position change sont réécrites.
+    """
     
-    # Vérifier que la todolist existe
-    todolist = db.query(models.TodoList).filter(models.TodoList.id == todolist_id).first()
+    # Vérifier que la todolist existe et sérialiser les écritures sur celle-ci
+    todolist = locking.acquire_todolist(db, todolist_id, if_match)
     if not todolist:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Todolist not found"
         )
+    locking.set_etag(response, todolist)
+    
+    # Une seule requête pour valider les ids et connaître l'état courant de la liste
+    current = {
+        row.id: row for row in db.query(
+            models.Todo.id, models.Todo.completed, models.Todo.priority
+        ).filter(models.Todo.todolist_id == todolist_id).all()
+    }
+    if len(set(todo_ids)) != len(todo_ids) or any(todo_id not in current for todo_id in todo_ids):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Todos doesn't exist in this todolist"
+        )
     
     try:
-        # Vérifier que tous les todo_ids existent dans cette todolist
-        existing_todos = db.query(models.Todo).filter(
-            models.Todo.id.in_(todo_ids),
-            models.Todo.todolist_id == todolist_id
-        ).all()
+        if ordering.is_rank_mode():
+            _reorder_by_rank(db, todolist_id, todo_ids)
+            return {"message": "Todos reordered successfully"}
         
-        if len(existing_todos) != len(todo_ids):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Todos doesn't exist in this todolist"
-            )
+        full_list = len(todo_ids) == len(current)
+        if full_list:
+            # Liste complète : actifs puis terminés dans l'ordre fourni, aucune renumérotation nécessaire
+            ordered_ids = [todo_id for todo_id in todo_ids if not current[todo_id].completed]
+            ordered_ids += [todo_id for todo_id in todo_ids if current[todo_id].completed]
+        else:
+            ordered_ids = todo_ids
         
-        # Réorganiser selon l'ordre fourni
-        for index, todo_id in enumerate(todo_ids, 1):
-            db.query(models.Todo).filter(
-                models.Todo.id == todo_id,
-                models.Todo.todolist_id == todolist_id
-            ).update({"priority": index})
+        new_priorities = {todo_id: index for index, todo_id in enumerate(ordered_ids, 1)}
+        if diff:
+            new_priorities = {
+                todo_id: priority for todo_id, priority in new_priorities.items()
+                if current[todo_id].priority != priority
+            }
         
-        # flush pour forcer la synchronisation
-        db.flush()
-        db.commit()
+        # Toutes les priorités en une seule requête
+        ordering.write_priorities(db, new_priorities)
         
-        # Recalculer toutes les priorités pour maintenir la cohérence
-        recalculate_priorities(db, todolist_id)
+        if not full_list:
+            # Les todos non fournis gardent leur place relative
+            ordering.renumber_priorities(db, todolist_id)
+        
+        db.commit()
         
         return {"message": "Todos reordered successfully"}
         
@@ -241,9 +355,9 @@ def reorder_todos(todolist_id: int, todo_ids: List[int], db: Session = Depends(g
         )
 
 @router.delete("/{todolist_id}")
-def delete_todolist(todolist_id: int, db: Session = Depends(get_db)):
+def delete_todolist(todolist_id: int, if_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
     """Supprimer une TodoList et toutes ses todos"""
-    db_todolist = db.query(models.TodoList).filter(models.TodoList.id == todolist_id).first()
+    db_todolist = locking.acquire_todolist(db, todolist_id, if_match)
     if not db_todolist:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -251,6 +365,8 @@ def delete_todolist(todolist_id: int, db: Session = Depends(get_db)):
         )
     
     try:
+        # Charger les todos pour la suppression en cascade (pas de chargement paresseux)
+        db_todolist = queries.todolist_query(db).filter(models.TodoList.id == todolist_id).one()
         db.delete(db_todolist)
         db.commit()
         return {"message": "Todolist deleted successfully"}
@@ -265,16 +381,19 @@ def delete_todolist(todolist_id: int, db: Session = Depends(get_db)):
 @router.get("/{todolist_id}/todos", response_model=List[Todo])
 def get_todos_from_list(
     todolist_id: int,
+    response: Response,
     completed: Optional[bool] = None,
     db: Session = Depends(get_db)
 ):
     """Récupérer les todos d'une TodoList avec filtre optionnel"""
-    todolist = db.query(models.TodoList).filter(models.TodoList.id == todolist_id).first()
+    # La catégorie est chargée une fois : chaque todo sérialisée référence cette même TodoList
+    todolist = queries.todolist_with_category_query(db).filter(models.TodoList.id == todolist_id).first()
     if not todolist:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Todolist not found"
         )
+    locking.set_etag(response, todolist)
     
     query = db.query(models.Todo).filter(models.Todo.todolist_id == todolist_id)
     
@@ -282,7 +401,23 @@ def get_todos_from_list(
     if completed is not None:
         query = query.filter(models.Todo.completed == completed)
     
-    return query.order_by(models.Todo.priority).all()
+    todos = query.order_by(models.Todo.priority).all()
+    if completed is not None:
+        # Positions calculées sur la liste complète, pas seulement le sous-ensemble filtré
+        return [ordering.apply_position(db, todo) for todo in todos] if ordering.is_rank_mode() else todos
+    return ordering.apply_positions(todos)
+
+
+@router.get("/{todolist_id}/stats", response_model=TodoListStats)
+def get_todolist_stats(todolist_id: int, db: Session = Depends(get_db)):
+    """Statistiques d'une TodoList, calculées par agrégation SQL"""
+    todolist_stats = stats.todolist_stats(db, todolist_id)
+    if todolist_stats is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Todolist not found"
+        )
+    return todolist_stats
 
 
 @router.post("/generate_courses", response_model=TodoList)
@@ -324,28 +459,31 @@ def generate_courses(recipe_ids: List[int], db: Session = Depends(get_db)):
     db.commit()
     db.refresh(course_list)
 
-    # Copier les ingrédients
-    for rlist in recipe_lists:
-        todos = db.query(models.Todo).filter(models.Todo.todolist_id == rlist.id).all()
-        for todo in todos:
-            new_todo = models.Todo(
-                name=todo.name,
-                completed=False,
-                priority=9999,
-                quantity=todo.quantity,
-                todolist_id=course_list.id,
-            )
-            db.add(new_todo)
-    db.commit()
-    recalculate_priorities(db, course_list.id)
-    db.refresh(course_list)
+    # Copier les ingrédients (une seule requête pour toutes les recettes)
+    new_todos = []
+    todos = db.query(models.Todo).filter(
+        models.Todo.todolist_id.in_([rlist.id for rlist in recipe_lists])
+    ).order_by(models.Todo.todolist_id, models.Todo.priority).all()
+    for todo in todos:
+        new_todo = models.Todo(
+            name=todo.name,
+            completed=False,
+            priority=9999,
+            quantity=todo.quantity,
+            todolist_id=course_list.id,
+        )
+        db.add(new_todo)
+        new_todos.append(new_todo)
+    _finalize_appended_todos(db, course_list.id, new_todos)
+    course_list = queries.todolist_query(db).filter(models.TodoList.id == course_list.id).one()
+    ordering.apply_positions(course_list.todos)
     return course_list
 
 @router.get("/{todolis_id_parent}/links", response_model=List[TodoList])  
 def get_all_todolist_links_by_parent(todolis_id_parent : int, db: Session = Depends(get_db)):
     """Récupérer toutes les TodoLists liées à une TodoList parent"""
     child_todolists = (
-        db.query(models.TodoList)
+        queries.todolist_query(db)
         .join(models.Link, models.Link.todolist_id_child == models.TodoList.id)
         .filter(models.Link.todolist_id_parent == todolis_id_parent)
         .all()
@@ -384,8 +522,7 @@ def add_link(todolist_id_parent : int, todolist_id_child :int ,db: Session = Dep
     try:
         db.add(db_link)
         db.commit()
-        db.refresh(db_link) 
-        return db_link
+        return queries.link_query(db).filter(models.Link.id == db_link.id).one()
     except IntegrityError:
         db.rollback()
         raise HTTPException(
@@ -403,12 +540,18 @@ def add_link(todolist_id_parent : int, todolist_id_child :int ,db: Session = Dep
 
 
 @router.post("/{todolist_id}/populate_from_links", response_model=TodoList)
-def populate_from_links(todolist_id: int, db: Session = Depends(get_db)):
+def populate_from_links(
+    todolist_id: int,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
     """Ajoute tous les todos des recettes liées à une todolist"""
 
-    todolist = db.query(models.TodoList).filter(models.TodoList.id == todolist_id).first()
+    todolist = locking.acquire_todolist(db, todolist_id, if_match)
     if not todolist:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Todolist not found")
+    locking.set_etag(response, todolist)
 
     linked_recipes = (
         db.query(models.TodoList)
@@ -420,19 +563,23 @@ def populate_from_links(todolist_id: int, db: Session = Depends(get_db)):
     if not linked_recipes:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No linked recipes found")
 
-    for recipe in linked_recipes:
-        todos = db.query(models.Todo).filter(models.Todo.todolist_id == recipe.id).all()
-        for todo in todos:
-            new_todo = models.Todo(
-                name=todo.name,
-                completed=False,
-                priority=9999,
-                quantity=todo.quantity,
-                todolist_id=todolist_id,
-            )
-            db.add(new_todo)
+    # Une seule requête pour les ingrédients de toutes les recettes liées
+    new_todos = []
+    todos = db.query(models.Todo).filter(
+        models.Todo.todolist_id.in_([recipe.id for recipe in linked_recipes])
+    ).order_by(models.Todo.todolist_id, models.Todo.priority).all()
+    for todo in todos:
+        new_todo = models.Todo(
+            name=todo.name,
+            completed=False,
+            priority=9999,
+            quantity=todo.quantity,
+            todolist_id=todolist_id,
+        )
+        db.add(new_todo)
+        new_todos.append(new_todo)
 
-    db.commit()
-    recalculate_priorities(db, todolist_id)
-    db.refresh(todolist)
+    _finalize_appended_todos(db, todolist_id, new_todos)
+    todolist = queries.todolist_query(db).filter(models.TodoList.id == todolist_id).one()
+    ordering.apply_positions(todolist.todos)
     return todolist
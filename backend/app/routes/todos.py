@@ -1,81 +1,141 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from app.schemas import TodoCreate, Todo, TodoUpdate
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from app.schemas import TodoCreate, Todo, TodoUpdate, TodoFilter, Suggestion
 from sqlalchemy import func
-from app.db import models
+from app.db import locking, models, ordering, queries, search
 from app.db.session import get_db
-from typing import List
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, keyset_page, set_next_cursor
+from app import suggestions
+from typing import List, Optional
 from sqlalchemy.exc import IntegrityError
 
 router = APIRouter()
 
-# ===== FONCTION HELPER POUR RECALCULER LES PRIORITÉS =====
-def recalculate_priorities(db: Session, todolist_id: int):
-    """Recalcule toutes les priorités d'une TodoList : actifs en premier, puis terminés"""
-    
-    # Récupérer tous les todos actifs (non terminés) triés par priorité
-    active_todos = db.query(models.Todo).filter(
-        models.Todo.todolist_id == todolist_id,
-        models.Todo.completed == False
-    ).order_by(models.Todo.priority.asc()).all()
-    
-    # Récupérer tous les todos terminés triés par priorité
-    completed_todos = db.query(models.Todo).filter(
-        models.Todo.todolist_id == todolist_id,
-        models.Todo.completed == True
-    ).order_by(models.Todo.priority.asc()).all()
-    
-    print(f"🔢 Recalcul pour todolist {todolist_id}:")
-    print(f"   📋 Actifs: {[f'{t.id}(p:{t.priority})' for t in active_todos]}")
-    print(f"   ✅ Terminés: {[f'{t.id}(p:{t.priority})' for t in completed_todos]}")
+def _acquire_parent(db: Session, db_todo: models.Todo, response: Response, if_match: Optional[str]) -> models.TodoList:
+    """Sérialise l'écriture sur la TodoList parente puis relit la todo, qui a pu changer avant le verrou"""
+    todolist = locking.acquire_todolist(db, db_todo.todolist_id, if_match)
+    db.refresh(db_todo)
+    locking.set_etag(response, todolist)
+    return todolist
+
+def _reload(db: Session, todo_id: int) -> models.Todo:
+    """Relit une todo avec sa TodoList et sa catégorie, en une requête, pour la sérialisation"""
+    db_todo = queries.todo_query(db).filter(models.Todo.id == todo_id).one()
+    return ordering.apply_position(db, db_todo)
+
+def _move_todo_by_rank(db: Session, db_todo: models.Todo, new_priority: int) -> models.Todo:
+    """Déplacement en mode rank : une seule ligne écrite (hors rééquilibrage occasionnel)"""
+    position = new_priority
+    if db_todo.completed:
+        # Les positions sont globales : les terminés viennent après tous les actifs
+        active_count = db.query(func.count(models.Todo.id)).filter(
+            models.Todo.todolist_id == db_todo.todolist_id,
+            models.Todo.completed == False
+        ).scalar()
+        position = max(new_priority - active_count, 1)
+
+    ordering.place_todo(db, db_todo, position)
+    db.commit()
+    return _reload(db, db_todo.id)
+
+@router.get("/", response_model=List[Todo]) 
+def get_todos(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    completed: Optional[bool] = None,
+    todolist_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """Récupérer les todos, paginées par curseur sur (todolist_id, priority, id)
+
+    Le curseur de la page suivante est renvoyé dans l'en-tête `X-Next-Cursor`.
+    """
+    query = queries.todo_query(db)
     
+    if completed is not None:
+        query = query.filter(models.Todo.completed == completed)
+    if todolist_id is not None:
+        query = query.filter(models.Todo.todolist_id == todolist_id)
     
-    # Renuméroter les todos actifs : 1, 2, 3...
-    for index, todo in enumerate(active_todos, 1):
-        old_priority = todo.priority
-        todo.priority = index
-        if old_priority != index:
-            print(f"   🔄 Actif {todo.id}: {old_priority} → {index}")
+    todos, next_cursor = keyset_page(
+        query,
+        (models.Todo.todolist_id, models.Todo.priority, models.Todo.id),
+        limit,
+        cursor
+    )
+    set_next_cursor(request, response, next_cursor)
     
-    # Renuméroter les todos terminés : après les actifs
-    start_priority = len(active_todos) + 1
-    for index, todo in enumerate(completed_todos, start_priority):
-        old_priority = todo.priority
-        todo.priority = index
-        if old_priority != index:
-            print(f"   ✅ Terminé {todo.id}: {old_priority} → {index}")
+    if ordering.is_rank_mode():
+        # Une page ne contient pas forcément toute la liste : position calculée todo par todo
+        return [ordering.apply_position(db, todo) for todo in todos]
+    return todos
 
-    # flush pour forcer la synchronisation
-    db.flush()
-    db.commit()
-    
-    print(f"💾 Recalcul terminé: {len(active_todos)} actifs, {len(completed_todos)} terminés")
+def _todo_filter(
+    completed: Optional[bool] = None,
+    priority: Optional[int] = None,
+    search: Optional[str] = None
+) -> TodoFilter:
+    """Paramètres de requête validés par le schéma TodoFilter (erreurs renvoyées en 422)"""
+    try:
+        return TodoFilter(completed=completed, priority=priority, search=search)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False, include_context=False))
 
-    return len(active_todos) + len(completed_todos)
+@router.get("/search", response_model=List[Todo])
+def search_todos(
+    request: Request,
+    response: Response,
+    filters: TodoFilter = Depends(_todo_filter),
+    todolist_id: Optional[int] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Rechercher des todos par nom (insensible aux accents et à la casse), classées par pertinence
 
-@router.get("/", response_model=List[Todo]) 
-def get_todos(db: Session = Depends(get_db)):
-    """Récupérer toutes les todos"""
-    return db.query(models.Todo).options(
-        joinedload(models.Todo.todolist).joinedload(models.TodoList.category)
-        ).order_by(models.Todo.todolist_id, models.Todo.priority).all()
+    Le curseur de la page suivante est renvoyé dans l'en-tête `X-Next-Cursor`.
+    """
+    todos, next_cursor = search.search_todos(db, filters, todolist_id, limit, cursor)
+    set_next_cursor(request, response, next_cursor)
+    return todos
+
+@router.get("/suggest", response_model=List[Suggestion])
+def suggest_todo_names(
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """Suggérer des noms de todos commençant par un préfixe, les plus utilisés d'abord"""
+    suggestions.index.ensure_loaded(db)
+    return [Suggestion(name=name, count=count) for name, count in suggestions.index.suggest(prefix, limit)]
 
 @router.get("/{todolist_id}", response_model=List[Todo])
 def get_todos_by_todolist(todolist_id: int, db: Session = Depends(get_db)):
     """Récupérer les todos d'une TodoList spécifique"""
-    todolist = db.query(models.TodoList).filter(models.TodoList.id == todolist_id).first()
+    todolist = queries.todolist_with_category_query(db).filter(models.TodoList.id == todolist_id).first()
     if not todolist:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, 
             detail="Todolist not found"
         )
     
-    return db.query(models.Todo).filter(
+    todos = db.query(models.Todo).filter(
         models.Todo.todolist_id == todolist_id
     ).order_by(models.Todo.priority).all()
+    return ordering.apply_positions(todos)
 
 @router.put("/{todo_id}", response_model=Todo)
-def update_todo(todo_id: int, todo_update: TodoUpdate, db: Session = Depends(get_db)):
+def update_todo(
+    todo_id: int,
+    todo_update: TodoUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
     """Mettre à jour une todo avec gestion des priorités"""
     
     db_todo = db.query(models.Todo).filter(models.Todo.id == todo_id).first()
@@ -84,6 +144,7 @@ def update_todo(todo_id: int, todo_update: TodoUpdate, db: Session = Depends(get
             status_code=status.HTTP_404_NOT_FOUND, 
             detail="Todo not found"
         )
+    _acquire_parent(db, db_todo, response, if_match)
 
     try:
         # Mettre à jour uniquement les champs fournis
@@ -100,17 +161,20 @@ def update_todo(todo_id: int, todo_update: TodoUpdate, db: Session = Depends(get
                     status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
                     detail="Position must be a positive number"
                 )
-            db_todo.priority = todo_update.priority
+            if ordering.is_rank_mode():
+                ordering.place_todo(db, db_todo, todo_update.priority)
+            else:
+                db_todo.priority = todo_update.priority
         if todo_update.quantity is not None:
             db_todo.quantity = todo_update.quantity
+        
+        if not ordering.is_rank_mode():
+            # Recalculer les priorités dans la même transaction
+            db.flush()
+            ordering.renumber_priorities(db, db_todo.todolist_id)
                 
         db.commit()
-        
-        # Recalculer les priorités des TodoLists affectées
-        recalculate_priorities(db, db_todo.todolist_id)
-        
-        db.refresh(db_todo)
-        return db_todo
+        return _reload(db, todo_id)
         
     except IntegrityError as e:
         db.rollback()
@@ -126,7 +190,12 @@ def update_todo(todo_id: int, todo_update: TodoUpdate, db: Session = Depends(get
         )
 
 @router.delete("/{todo_id}")
-def delete_todo(todo_id: int, db: Session = Depends(get_db)):
+def delete_todo(
+    todo_id: int,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
     """Supprimer une todo et recalculer les priorités"""
     
     db_todo = db.query(models.Todo).filter(models.Todo.id == todo_id).first()
@@ -135,16 +204,21 @@ def delete_todo(todo_id: int, db: Session = Depends(get_db)):
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Todo not found"
         )
+    _acquire_parent(db, db_todo, response, if_match)
     
     try:
         todolist_id = db_todo.todolist_id
         
         # Supprimer la todo
         db.delete(db_todo)
-        db.commit()
         
-        # Recalculer toutes les priorités de la TodoList
-        recalculate_priorities(db, todolist_id)
+        # En mode rank, l'ordre des autres todos n'est pas affecté
+        if not ordering.is_rank_mode():
+            # Recalculer toutes les priorités de la TodoList dans la même transaction
+            db.flush()
+            ordering.renumber_priorities(db, todolist_id)
+        
+        db.commit()
         
         return {"message":  "Todo deleted successfully"}
         
@@ -156,7 +230,12 @@ def delete_todo(todo_id: int, db: Session = Depends(get_db)):
         )
 
 @router.patch("/{todo_id}/toggle", response_model=Todo)
-def toggle_todo(todo_id: int, db: Session = Depends(get_db)):
+def toggle_todo(
+    todo_id: int,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
     """Toggle le statut d'un todo et réorganise automatiquement les priorités"""
     
     # Récupérer le todo
@@ -166,20 +245,20 @@ def toggle_todo(todo_id: int, db: Session = Depends(get_db)):
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Todo not found"
         )
+    _acquire_parent(db, db_todo, response, if_match)
     
     try:
-        # Toggle du statut
-        was_completed = db_todo.completed
-        db_todo.completed = not db_todo.completed
-        
-        # Commit le changement de statut d'abord
+        if ordering.is_rank_mode():
+            # La clé est conservée : le todo rejoint l'autre groupe à sa place relative
+            db_todo.completed = not db_todo.completed
+            db.commit()
+            return _reload(db, todo_id)
+
+        # Toggle du statut et décalage de la seule plage concernée, en une transaction
+        ordering.toggle_with_shift(db, db_todo)
         db.commit()
         
-        recalculate_priorities(db, db_todo.todolist_id)
-        
-        db.refresh(db_todo)
-        
-        return db_todo
+        return _reload(db, todo_id)
         
     except Exception as e:
         db.rollback()
@@ -189,7 +268,13 @@ def toggle_todo(todo_id: int, db: Session = Depends(get_db)):
         )
 
 @router.patch("/{todo_id}/move", response_model=Todo)
-def move_todo_to_position(todo_id: int, new_priority: int, db: Session = Depends(get_db)):
+def move_todo_to_position(
+    todo_id: int,
+    new_priority: int,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
     """Déplacer une todo à une position spécifique"""
     
     if new_priority < 1:
@@ -204,13 +289,18 @@ def move_todo_to_position(todo_id: int, new_priority: int, db: Session = Depends
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Todo not found"        
         )
+    _acquire_parent(db, db_todo, response, if_match)
     
     try:
+        if ordering.is_rank_mode():
+            return _move_todo_by_rank(db, db_todo, new_priority)
+
         old_priority = db_todo.priority
         todolist_id = db_todo.todolist_id
         
         if new_priority == old_priority:
-            return db_todo  # Aucun changement nécessaire
+            db.commit()  # Seule la version de la liste change
+            return _reload(db, todo_id)  # Aucun changement nécessaire
         
         # Compter le nombre total de todos dans la liste
         total_todos = db.query(func.count(models.Todo.id)).filter(
@@ -242,13 +332,12 @@ def move_todo_to_position(todo_id: int, new_priority: int, db: Session = Depends
         # Mettre à jour la priorité de la todo
         db_todo.priority = new_priority
         
+        # Recalculer toutes les priorités pour maintenir la cohérence, dans la même transaction
+        db.flush()
+        ordering.renumber_priorities(db, todolist_id)
         db.commit()
         
-        # Recalculer toutes les priorités pour maintenir la cohérence
-        recalculate_priorities(db, todolist_id)
-        
-        db.refresh(db_todo)
-        return db_todo
+        return _reload(db, todo_id)
         
     except Exception as e:
         db.rollback()
@@ -1,4 +1,5 @@
 from __future__ import annotations
+from datetime import date, datetime
 from pydantic import BaseModel, Field, field_validator, model_validator
 from typing import List, Optional, Any, TYPE_CHECKING
 
@@ -207,6 +208,7 @@ class Todo(TodoBase):
     """Modèle de réponse pour un Todo"""
     id: int = Field(..., gt=0, description="Identifiant unique de la tâche")
     todolist_id: int = Field(..., gt=0, description="ID de la TodoList")
+    completed_at: Optional[datetime] = Field(None, description="Date de completion (UTC)")
     
     # Ajoutez cette ligne pour inclure la relation (avec le modèle simplifié)
     todolist: Optional[TodoListSimple] = Field(
@@ -321,6 +323,19 @@ class TodoList(TodoListBase):
     class Config:
         from_attributes = True
 
+class TodoListSummary(BaseModel):
+    """Résumé d'une TodoList : compteurs agrégés, sans les todos"""
+    id: int = Field(..., gt=0, description="Identifiant unique de la liste")
+    name: str = Field(..., description="Nom de la liste de tâches")
+    category_id: Optional[int] = Field(None, description="ID de la catégorie")
+    category: Optional[Category] = Field(None, description="Catégorie associée (si définie)")
+    total: int = Field(..., ge=0, description="Nombre total de tâches")
+    completed: int = Field(..., ge=0, description="Nombre de tâches terminées")
+    pending: int = Field(..., ge=0, description="Nombre de tâches en cours")
+
+    class Config:
+        from_attributes = True
+
 # ===== MODÈLES POUR LES STATISTIQUES ET FILTRES =====
 
 class TodoStats(BaseModel):
@@ -330,6 +345,29 @@ class TodoStats(BaseModel):
     pending_todos: int = Field(..., ge=0)
     completion_rate: float = Field(..., ge=0.0, le=100.0)
     priority_distribution: dict[int, int] = Field(default_factory=dict)
+    completed_priority_distribution: dict[int, int] = Field(default_factory=dict)
+    average_priority: float = Field(0.0, ge=0.0)
+
+class TodoListStats(TodoStats):
+    """Statistiques d'une TodoList identifiée"""
+    todolist_id: int = Field(..., gt=0)
+    name: str
+
+class GlobalStats(TodoStats):
+    """Statistiques globales, avec le détail par TodoList"""
+    total_lists: int = Field(..., ge=0)
+    todolists: List[TodoListStats] = Field(default_factory=list)
+
+class DayActivity(BaseModel):
+    """Activité d'une journée : todos créées et terminées"""
+    date: date
+    created: int = Field(..., ge=0)
+    completed: int = Field(..., ge=0)
+
+class Suggestion(BaseModel):
+    """Nom de todo suggéré, avec son nombre d'usages"""
+    name: str
+    count: int = Field(..., ge=1)
 
 class TodoFilter(BaseModel):
     """Filtres pour la recherche de todos"""
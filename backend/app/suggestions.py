@@ -0,0 +1,124 @@
+import bisect
+import heapq
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.db.text import normalize_name
+
+# Nombre maximal de noms distincts gardés en mémoire (les moins utilisés sont évincés)
+SUGGEST_MAX_ENTRIES = int(os.getenv("SUGGEST_MAX_ENTRIES", "50000"))
+
+# Après éviction, l'index redescend à cette fraction du plafond (évite une éviction par insertion)
+_EVICTION_RATIO = 0.9
+
+
+class PrefixIndex:
+    """Index de préfixes en mémoire : noms normalisés triés + bisect, pondérés par leur nombre d'usages.
+
+    Une recherche coûte O(log n) pour trouver la plage du préfixe, puis O(m log k) pour
+    garder les k noms les plus utilisés parmi les m qui commencent par ce préfixe.
+    """
+
+    def __init__(self, max_entries: int = SUGGEST_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.loaded = False
+        self._keys: List[str] = []
+        # nom normalisé -> [nombre d'usages, nom affiché]
+        self._entries: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._keys = []
+            self._entries = {}
+            self.loaded = False
+
+    def load(self, db: Session) -> None:
+        """Construit l'index depuis models.Todo : une requête GROUP BY, limitée au plafond"""
+        usage = func.count(models.Todo.id)
+        rows = (
+            db.query(models.Todo.search_name, func.max(models.Todo.name), usage)
+            .filter(models.Todo.search_name.isnot(None), models.Todo.search_name != "")
+            .group_by(models.Todo.search_name)
+            .order_by(usage.desc())
+            .limit(self.max_entries)
+            .all()
+        )
+        with self._lock:
+            self._entries = {key: [count, name] for key, name, count in rows}
+            self._keys = sorted(self._entries)
+            self.loaded = True
+
+    def ensure_loaded(self, db: Session) -> None:
+        if not self.loaded:
+            self.load(db)
+
+    def add(self, name: str, count: int = 1) -> None:
+        """Ajoute un usage d'un nom ; le dernier libellé vu devient le libellé affiché"""
+        key = normalize_name(name)
+        if not key:
+            return
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[0] += count
+                entry[1] = name
+                return
+            self._entries[key] = [count, name]
+            bisect.insort(self._keys, key)
+            if len(self._keys) > self.max_entries:
+                self._evict()
+
+    def _evict(self) -> None:
+        keep = heapq.nlargest(
+            int(self.max_entries * _EVICTION_RATIO), self._entries.items(), key=lambda item: item[1][0]
+        )
+        self._entries = dict(keep)
+        self._keys = sorted(self._entries)
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Tuple[str, int]]:
+        """Les `limit` noms les plus utilisés commençant par le préfixe (normalisé) : [(nom, usages)]"""
+        key = normalize_name(prefix)
+        if not key:
+            return []
+        with self._lock:
+            start = bisect.bisect_left(self._keys, key)
+            # Borne haute : premier nom qui ne commence plus par le préfixe
+            end = bisect.bisect_left(self._keys, key + "\uffff", lo=start)
+            best = heapq.nlargest(
+                limit, self._keys[start:end], key=lambda candidate: self._entries[candidate][0]
+            )
+            return [(self._entries[candidate][1], self._entries[candidate][0]) for candidate in best]
+
+
+index = PrefixIndex()
+
+
+# Les todos insérées sont ajoutées à l'index au commit seulement, pour ignorer les transactions annulées
+
+@event.listens_for(models.Todo, "after_insert")
+def _remember_inserted_name(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault("suggest_pending", []).append(target.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _index_committed_names(session):
+    pending: Optional[list] = session.info.pop("suggest_pending", None)
+    if pending and index.loaded:
+        for name in pending:
+            index.add(name)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_names(session):
+    session.info.pop("suggest_pending", None)
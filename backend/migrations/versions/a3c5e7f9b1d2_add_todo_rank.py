@@ -0,0 +1,55 @@
+"""add todo rank
+
+Revision ID: a3c5e7f9b1d2
+Revises: 3d1a87084970
+Create Date: 2026-10-18 09:12:41.204518
+
+"""
+from itertools import groupby
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.db.ordering import rank_sequence
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c5e7f9b1d2'
+down_revision: Union[str, None] = '3d1a87084970'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+todos = sa.table(
+    'todos',
+    sa.column('id', sa.Integer),
+    sa.column('todolist_id', sa.Integer),
+    sa.column('completed', sa.Boolean),
+    sa.column('priority', sa.Integer),
+    sa.column('rank', sa.String),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('todos', sa.Column('rank', sa.String(length=64), nullable=True))
+    op.create_index('ix_todos_todolist_completed_rank', 'todos', ['todolist_id', 'completed', 'rank'], unique=False)
+
+    # Backfill : les clés suivent l'ordre actuel des priorités, liste par liste
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(todos.c.id, todos.c.todolist_id)
+        .order_by(todos.c.todolist_id, todos.c.completed, todos.c.priority, todos.c.id)
+    ).all()
+
+    for _, list_rows in groupby(rows, key=lambda row: row.todolist_id):
+        ids = [row.id for row in list_rows]
+        bind.execute(
+            todos.update().where(todos.c.id == sa.bindparam('todo_id')).values(rank=sa.bindparam('new_rank')),
+            [{'todo_id': todo_id, 'new_rank': key} for todo_id, key in zip(ids, rank_sequence(len(ids)))]
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_todos_todolist_completed_rank', table_name='todos')
+    op.drop_column('todos', 'rank')
@@ -0,0 +1,28 @@
+"""add todolist version
+
+Revision ID: b7d2e4f6a8c1
+Revises: a3c5e7f9b1d2
+Create Date: 2026-10-18 10:03:17.558214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2e4f6a8c1'
+down_revision: Union[str, None] = 'a3c5e7f9b1d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('todolist', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('todolist', 'version')
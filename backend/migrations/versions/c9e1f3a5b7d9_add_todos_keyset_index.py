@@ -0,0 +1,28 @@
+"""add todos keyset index
+
+Revision ID: c9e1f3a5b7d9
+Revises: b7d2e4f6a8c1
+Create Date: 2026-10-18 11:26:54.903127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9e1f3a5b7d9'
+down_revision: Union[str, None] = 'b7d2e4f6a8c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_todos_todolist_priority_id', 'todos', ['todolist_id', 'priority', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_todos_todolist_priority_id', table_name='todos')
@@ -0,0 +1,41 @@
+"""add todolist counters
+
+Revision ID: d4f6a8c0e2b4
+Revises: c9e1f3a5b7d9
+Create Date: 2026-10-18 11:47:05.319826
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f6a8c0e2b4'
+down_revision: Union[str, None] = 'c9e1f3a5b7d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('todolist', sa.Column('total_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('todolist', sa.Column('completed_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill en une requête ; `python -m app.db.counters` recalcule par lots si besoin
+    op.execute(
+        """
+        UPDATE todolist SET
+            total_count = (SELECT COUNT(*) FROM todos WHERE todos.todolist_id = todolist.id),
+            completed_count = (
+                SELECT COUNT(*) FROM todos WHERE todos.todolist_id = todolist.id AND todos.completed
+            )
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('todolist', 'completed_count')
+    op.drop_column('todolist', 'total_count')
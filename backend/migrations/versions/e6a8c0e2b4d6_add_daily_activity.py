@@ -0,0 +1,56 @@
+"""add daily activity rollup and completed_at index
+
+Revision ID: e6a8c0e2b4d6
+Revises: d4f6a8c0e2b4
+Create Date: 2026-10-18 13:21:48.604137
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6a8c0e2b4d6'
+down_revision: Union[str, None] = 'd4f6a8c0e2b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+todos = sa.table(
+    'todos',
+    sa.column('todolist_id', sa.Integer),
+    sa.column('created_at', sa.DateTime),
+    sa.column('completed_at', sa.DateTime),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_todos_completed_at'), 'todos', ['completed_at'], unique=False)
+    daily_activity = op.create_table(
+        'daily_activity',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('todolist_id', sa.Integer(), nullable=False),
+        sa.Column('created', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('completed', sa.Integer(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['todolist_id'], ['todolist.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('day', 'todolist_id')
+    )
+
+    # Backfill des créations ; completed_at n'était jamais renseigné, les complétions partent de zéro
+    day = sa.func.date(todos.c.created_at)
+    op.execute(
+        daily_activity.insert().from_select(
+            ['day', 'todolist_id', 'created', 'completed'],
+            sa.select(day, todos.c.todolist_id, sa.func.count(), sa.literal(0))
+            .where(todos.c.created_at.isnot(None))
+            .group_by(day, todos.c.todolist_id)
+        )
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('daily_activity')
+    op.drop_index(op.f('ix_todos_completed_at'), table_name='todos')
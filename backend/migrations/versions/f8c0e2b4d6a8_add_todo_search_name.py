@@ -0,0 +1,73 @@
+"""add todo search_name and full-text indexes
+
+Revision ID: f8c0e2b4d6a8
+Revises: e6a8c0e2b4d6
+Create Date: 2026-10-18 14:52:10.884213
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.db.models import POSTGRESQL_SEARCH_DDL, SQLITE_SEARCH_DDL
+from app.db.text import normalize_name
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f8c0e2b4d6a8'
+down_revision: Union[str, None] = 'e6a8c0e2b4d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+todos = sa.table(
+    'todos',
+    sa.column('id', sa.Integer),
+    sa.column('name', sa.String),
+    sa.column('search_name', sa.String),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('todos', sa.Column('search_name', sa.String(), nullable=True))
+
+    # Backfill par lots : la normalisation (accents, ligatures) est faite en Python
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(todos.c.id, todos.c.name)
+            .where(todos.c.id > last_id)
+            .order_by(todos.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            todos.update().where(todos.c.id == sa.bindparam('todo_id')).values(search_name=sa.bindparam('normalized')),
+            [{'todo_id': row.id, 'normalized': normalize_name(row.name)} for row in rows]
+        )
+        last_id = rows[-1].id
+
+    if bind.dialect.name == 'postgresql':
+        for statement in POSTGRESQL_SEARCH_DDL:
+            op.execute(statement)
+    elif bind.dialect.name == 'sqlite':
+        for statement in SQLITE_SEARCH_DDL:
+            op.execute(statement)
+        op.execute("INSERT INTO todos_fts(todos_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_todos_search_name_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_todos_search_name_tsv")
+    elif bind.dialect.name == 'sqlite':
+        for trigger in ('todos_fts_insert', 'todos_fts_delete', 'todos_fts_update'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS todos_fts")
+    op.drop_column('todos', 'search_name')
@@ -0,0 +1,126 @@
+from datetime import date, datetime, timedelta, timezone
+
+from fastapi import status
+
+from app.db import models
+
+
+def _today():
+    return datetime.now(timezone.utc).date()
+
+
+class TestCompletedAt:
+    """Tests de la date de completion"""
+
+    def test_toggle_sets_and_clears_completed_at(self, client, sample_todos):
+        """Test que completed_at suit le statut lors d'un toggle"""
+        response = client.patch(f"/todos/{sample_todos[0].id}/toggle")
+        assert response.json()["completed_at"] is not None
+
+        response = client.patch(f"/todos/{sample_todos[0].id}/toggle")
+        assert response.json()["completed_at"] is None
+
+    def test_update_sets_completed_at(self, client, sample_todos):
+        """Test que completed_at est renseignée par une mise à jour du statut"""
+        response = client.put(f"/todos/{sample_todos[1].id}", json={"completed": True})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["completed_at"] is not None
+
+    def test_rename_keeps_completed_at(self, client, db_session, sample_todos):
+        """Test qu'une mise à jour sans changement de statut ne touche pas completed_at"""
+        stamp = datetime(2026, 1, 1, 12, 0)
+        sample_todos[2].completed_at = stamp
+        db_session.commit()
+
+        response = client.put(f"/todos/{sample_todos[2].id}", json={"name": "Renommée"})
+
+        assert response.json()["completed_at"] == stamp.isoformat()
+
+
+class TestDailyActivity:
+    """Tests de la table d'agrégats journaliers"""
+
+    def test_rollup_tracks_created_and_completed(self, client, db_session, sample_todolist):
+        """Test que créations et complétions sont comptées au jour près"""
+        todolist_id = sample_todolist.id
+        created = [
+            client.post(f"/todolists/{todolist_id}/todos", json={"name": name}).json()
+            for name in ["Todo A", "Todo B"]
+        ]
+        client.patch(f"/todos/{created[0]['id']}/toggle")
+
+        db_session.expire_all()
+        activity = db_session.query(models.DailyActivity).filter(
+            models.DailyActivity.todolist_id == todolist_id
+        ).one()
+        assert (activity.day, activity.created, activity.completed) == (_today(), 2, 1)
+
+    def test_uncomplete_removes_completion(self, client, db_session, sample_todolist):
+        """Test qu'une complétion annulée n'est plus comptée"""
+        todo = client.post(f"/todolists/{sample_todolist.id}/todos", json={"name": "Todo A"}).json()
+        client.patch(f"/todos/{todo['id']}/toggle")
+        client.patch(f"/todos/{todo['id']}/toggle")
+
+        db_session.expire_all()
+        activity = db_session.query(models.DailyActivity).one()
+        assert activity.completed == 0
+
+    def test_delete_todolist_removes_activity(self, client, db_session, sample_todolist, sample_todos):
+        """Test que la suppression d'une liste supprime ses agrégats"""
+        client.delete(f"/todolists/{sample_todolist.id}")
+
+        assert db_session.query(models.DailyActivity).count() == 0
+
+
+class TestTimeseries:
+    """Tests de /stats/timeseries"""
+
+    def test_timeseries_fills_missing_days(self, client, db_session, multiple_todolists):
+        """Test que la série couvre chaque jour, agrégée sur toutes les listes"""
+        db_session.add_all([
+            models.DailyActivity(day=date(2026, 3, 1), todolist_id=multiple_todolists[0].id, created=2, completed=1),
+            models.DailyActivity(day=date(2026, 3, 1), todolist_id=multiple_todolists[1].id, created=1, completed=0),
+            models.DailyActivity(day=date(2026, 3, 3), todolist_id=multiple_todolists[0].id, created=0, completed=4),
+            models.DailyActivity(day=date(2026, 3, 9), todolist_id=multiple_todolists[0].id, created=5, completed=5),
+        ])
+        db_session.commit()
+
+        response = client.get("/stats/timeseries", params={"from": "2026-03-01", "to": "2026-03-03"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == [
+            {"date": "2026-03-01", "created": 3, "completed": 1},
+            {"date": "2026-03-02", "created": 0, "completed": 0},
+            {"date": "2026-03-03", "created": 0, "completed": 4},
+        ]
+
+    def test_timeseries_by_todolist(self, client, db_session, multiple_todolists):
+        """Test du filtre par TodoList"""
+        db_session.add_all([
+            models.DailyActivity(day=date(2026, 3, 1), todolist_id=multiple_todolists[0].id, created=2, completed=1),
+            models.DailyActivity(day=date(2026, 3, 1), todolist_id=multiple_todolists[1].id, created=1, completed=0),
+        ])
+        db_session.commit()
+
+        response = client.get(
+            "/stats/timeseries",
+            params={"from": "2026-03-01", "to": "2026-03-01", "todolist_id": multiple_todolists[1].id}
+        )
+
+        assert response.json() == [{"date": "2026-03-01", "created": 1, "completed": 0}]
+
+    def test_timeseries_defaults_to_last_week(self, client, sample_todolist):
+        """Test que la période par défaut couvre les 7 derniers jours"""
+        client.post(f"/todolists/{sample_todolist.id}/todos", json={"name": "Todo A"})
+
+        data = client.get("/stats/timeseries").json()
+
+        assert len(data) == 7
+        assert data[-1] == {"date": _today().isoformat(), "created": 1, "completed": 0}
+        assert data[0]["date"] == (_today() - timedelta(days=6)).isoformat()
+
+    def test_timeseries_invalid_range(self, client):
+        """Test qu'une période inversée ou trop longue est refusée"""
+        assert client.get("/stats/timeseries", params={"from": "2026-03-02", "to": "2026-03-01"}).status_code == 400
+        assert client.get("/stats/timeseries", params={"from": "2020-01-01", "to": "2026-03-01"}).status_code == 400
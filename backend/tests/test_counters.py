@@ -0,0 +1,119 @@
+from fastapi import status
+
+from app.db import counters, models
+
+
+def _counts(db_session, todolist_id):
+    db_session.expire_all()
+    todolist = db_session.query(models.TodoList).filter(models.TodoList.id == todolist_id).one()
+    return todolist.total_count, todolist.completed_count
+
+
+class TestTodoListCounters:
+    """Tests des compteurs dénormalisés, sur chaque chemin d'écriture"""
+
+    def test_add_todo(self, client, db_session, sample_todolist):
+        """Test qu'un ajout incrémente le total"""
+        todolist_id = sample_todolist.id
+        client.post(f"/todolists/{todolist_id}/todos", json={"name": "Todo A"})
+        client.post(f"/todolists/{todolist_id}/todos", json={"name": "Todo B"})
+
+        assert _counts(db_session, todolist_id) == (2, 0)
+
+    def test_toggle(self, client, db_session, sample_todolist, sample_todos):
+        """Test qu'un toggle déplace la todo d'un compteur à l'autre"""
+        todolist_id = sample_todolist.id
+        client.patch(f"/todos/{sample_todos[0].id}/toggle")
+        assert _counts(db_session, todolist_id) == (3, 2)
+
+        client.patch(f"/todos/{sample_todos[0].id}/toggle")
+        assert _counts(db_session, todolist_id) == (3, 1)
+
+    def test_update_completed(self, client, db_session, sample_todolist, sample_todos):
+        """Test qu'une mise à jour du statut ajuste le compteur de terminées"""
+        todolist_id = sample_todolist.id
+        client.put(f"/todos/{sample_todos[1].id}", json={"completed": True})
+        client.put(f"/todos/{sample_todos[1].id}", json={"name": "Renommée"})
+
+        assert _counts(db_session, todolist_id) == (3, 2)
+
+    def test_delete(self, client, db_session, todolist_with_mixed_todos):
+        """Test qu'une suppression décrémente les compteurs concernés"""
+        todolist = todolist_with_mixed_todos["todolist"]
+        completed_todo = todolist_with_mixed_todos["completed_todos"][0]
+        todolist_id = todolist.id
+
+        client.delete(f"/todos/{completed_todo.id}")
+
+        assert _counts(db_session, todolist_id) == (4, 1)
+
+    def test_generate_courses(self, client, db_session):
+        """Test que la génération de courses compte les ingrédients copiés"""
+        recipe_cat = models.Category(name="recette", color="#000000", icon="book")
+        db_session.add(recipe_cat)
+        db_session.commit()
+        recipe = models.TodoList(name="Recette", category_id=recipe_cat.id)
+        db_session.add(recipe)
+        db_session.flush()
+        db_session.add_all([
+            models.Todo(name=name, completed=False, priority=index, todolist_id=recipe.id)
+            for index, name in enumerate(["Tomate", "Oignon"], 1)
+        ])
+        db_session.commit()
+
+        response = client.post("/todolists/generate_courses", json=[recipe.id])
+
+        assert response.status_code == status.HTTP_200_OK
+        assert _counts(db_session, response.json()["id"]) == (2, 0)
+
+    def test_populate_from_links(self, client, db_session):
+        """Test que le remplissage depuis les liens compte les ingrédients copiés"""
+        course_list = models.TodoList(name="Courses")
+        recipe = models.TodoList(name="Recette")
+        db_session.add_all([course_list, recipe])
+        db_session.flush()
+        db_session.add(models.Todo(name="Tomate", completed=True, priority=1, todolist_id=recipe.id))
+        db_session.add(models.Link(todolist_id_parent=course_list.id, todolist_id_child=recipe.id))
+        db_session.commit()
+        course_id = course_list.id
+
+        client.post(f"/todolists/{course_id}/populate_from_links")
+
+        # Les ingrédients copiés repartent non terminés
+        assert _counts(db_session, course_id) == (1, 0)
+
+    def test_summary_reads_counters(self, client, db_session, sample_todolist, sample_todos):
+        """Test que le résumé reflète les compteurs"""
+        client.patch(f"/todos/{sample_todos[0].id}/toggle")
+
+        summary = client.get("/todolists/summary").json()[0]
+
+        assert (summary["total"], summary["completed"], summary["pending"]) == (3, 2, 1)
+
+
+class TestRepairCounts:
+    """Tests de la commande de réparation des compteurs"""
+
+    def test_repair_in_batches(self, db_session, complex_scenario, empty_todolist):
+        """Test que des compteurs faussés sont recalculés, lot par lot"""
+        db_session.query(models.TodoList).update(
+            {models.TodoList.total_count: 42, models.TodoList.completed_count: 7}, synchronize_session=False
+        )
+        db_session.commit()
+
+        repaired = counters.repair_counts(db_session, batch_size=2)
+
+        assert repaired == 3
+        assert _counts(db_session, complex_scenario["work_todolist"].id) == (4, 2)
+        assert _counts(db_session, complex_scenario["completed_todolist"].id) == (2, 2)
+        assert _counts(db_session, empty_todolist.id) == (0, 0)
+        assert counters.repair_counts(db_session) == 0
+
+    def test_recount_statement_compiles_for_postgresql(self):
+        """Test que la requête de recalcul est valide pour PostgreSQL"""
+        from sqlalchemy.dialects import postgresql
+
+        sql = str(counters.recount_statement([1, 2]).compile(dialect=postgresql.dialect()))
+
+        assert sql.startswith("UPDATE todolist SET")
+        assert "GROUP BY" in sql
@@ -0,0 +1,207 @@
+import random
+
+import pytest
+from fastapi import status
+
+from app.db import models, ordering
+
+
+class TestRankKeys:
+    """Tests unitaires des clés fractionnaires"""
+
+    def test_rank_between_bounds(self):
+        """Test qu'une clé générée est strictement entre ses bornes"""
+        assert "a" < ordering.rank_between("a", "b") < "b"
+        assert ordering.rank_between(None, "a") < "a"
+        assert ordering.rank_between("a", None) > "a"
+
+    def test_rank_between_invalid_interval(self):
+        """Test qu'un intervalle vide est refusé"""
+        with pytest.raises(ValueError):
+            ordering.rank_between("b", "a")
+
+    def test_rank_sequence_sorted_and_unique(self):
+        """Test que les clés générées sont triées et distinctes"""
+        keys = ordering.rank_sequence(5000)
+
+        assert keys == sorted(keys)
+        assert len(set(keys)) == 5000
+
+    def test_random_inserts_keep_order(self):
+        """Test que des insertions aléatoires conservent l'ordre lexicographique"""
+        rng = random.Random(42)
+        keys = ordering.rank_sequence(10)
+
+        for _ in range(500):
+            index = rng.randint(0, len(keys))
+            before = keys[index - 1] if index > 0 else None
+            after = keys[index] if index < len(keys) else None
+            keys.insert(index, ordering.rank_between(before, after))
+
+        assert keys == sorted(keys)
+        assert len(set(keys)) == len(keys)
+
+    def test_appends_do_not_grow_keys(self):
+        """Test que des ajouts successifs en fin de liste gardent des clés courtes"""
+        key = ordering.rank_sequence(1)[0]
+        for _ in range(5000):
+            key = ordering.rank_between(key, None)
+
+        assert len(key) <= ordering.RANK_SHIFT_WIDTH
+
+
+@pytest.fixture
+def rank_mode(monkeypatch):
+    """Active le mode d'ordonnancement par clés fractionnaires"""
+    monkeypatch.setattr(ordering, "ORDERING_MODE", "rank")
+
+
+class TestRankMode:
+    """Tests des routes en mode d'ordonnancement rank"""
+
+    def test_add_todos_positions(self, client, sample_todolist, rank_mode):
+        """Test que les todos ajoutés reçoivent des positions continues"""
+        for name in ["Todo A", "Todo B", "Todo C"]:
+            response = client.post(f"/todolists/{sample_todolist.id}/todos", json={"name": name})
+            assert response.status_code == status.HTTP_200_OK
+
+        response = client.get(f"/todolists/{sample_todolist.id}/todos")
+        data = response.json()
+        assert [t["name"] for t in data] == ["Todo A", "Todo B", "Todo C"]
+        assert [t["priority"] for t in data] == [1, 2, 3]
+
+    def test_toggle_writes_single_row(self, client, db_session, sample_todolist, rank_mode):
+        """Test qu'un toggle ne modifie pas les clés des autres todos"""
+        created = [
+            client.post(f"/todolists/{sample_todolist.id}/todos", json={"name": name}).json()
+            for name in ["Todo A", "Todo B", "Todo C"]
+        ]
+        ranks_before = {t.id: t.rank for t in db_session.query(models.Todo).all()}
+
+        response = client.patch(f"/todos/{created[0]['id']}/toggle")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["completed"] == True
+        assert response.json()["priority"] == 3
+        db_session.expire_all()
+        ranks_after = {t.id: t.rank for t in db_session.query(models.Todo).all()}
+        assert ranks_after == ranks_before
+
+        data = client.get(f"/todolists/{sample_todolist.id}/todos").json()
+        assert [t["name"] for t in data] == ["Todo B", "Todo C", "Todo A"]
+
+    def test_move_todo(self, client, sample_todolist, rank_mode):
+        """Test du déplacement d'un todo vers une position donnée"""
+        created = [
+            client.post(f"/todolists/{sample_todolist.id}/todos", json={"name": name}).json()
+            for name in ["Todo A", "Todo B", "Todo C", "Todo D"]
+        ]
+
+        response = client.patch(f"/todos/{created[3]['id']}/move", params={"new_priority": 2})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["priority"] == 2
+        data = client.get(f"/todolists/{sample_todolist.id}/todos").json()
+        assert [t["name"] for t in data] == ["Todo A", "Todo D", "Todo B", "Todo C"]
+
+    def test_reorder_todos(self, client, sample_todolist, rank_mode):
+        """Test de la réorganisation complète d'une liste"""
+        created = [
+            client.post(f"/todolists/{sample_todolist.id}/todos", json={"name": name}).json()
+            for name in ["Todo A", "Todo B", "Todo C"]
+        ]
+        new_order = [created[2]["id"], created[0]["id"], created[1]["id"]]
+
+        response = client.put(f"/todolists/{sample_todolist.id}/todos/reorder", json=new_order)
+
+        assert response.status_code == status.HTTP_200_OK
+        data = client.get(f"/todolists/{sample_todolist.id}/todos").json()
+        assert [t["id"] for t in data] == new_order
+
+    def test_legacy_todos_are_backfilled(self, client, sample_todos, sample_todolist, rank_mode):
+        """Test que les todos sans clé sont rééquilibrés d'après leur priorité"""
+        response = client.post(f"/todolists/{sample_todolist.id}/todos", json={"name": "Todo 4"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["priority"] == 3
+        data = client.get(f"/todolists/{sample_todolist.id}/todos").json()
+        assert [t["name"] for t in data] == ["Todo 1", "Todo 2", "Todo 4", "Todo 3"]
+
+    def test_rebalance_on_long_keys(self, client, db_session, sample_todolist, rank_mode, monkeypatch):
+        """Test que le rééquilibrage se déclenche quand les clés deviennent trop longues"""
+        monkeypatch.setattr(ordering, "RANK_MAX_LENGTH", 3)
+        created = [
+            client.post(f"/todolists/{sample_todolist.id}/todos", json={"name": name}).json()
+            for name in ["Todo A", "Todo B"]
+        ]
+
+        # Insertions répétées entre les deux mêmes voisins
+        for index in range(10):
+            client.post(f"/todolists/{sample_todolist.id}/todos", json={"name": f"Todo {index}", "priority": 2})
+
+        db_session.expire_all()
+        ranks = [t.rank for t in db_session.query(models.Todo).all()]
+        assert max(len(rank) for rank in ranks) <= 4
+        data = client.get(f"/todolists/{sample_todolist.id}/todos").json()
+        assert data[0]["id"] == created[0]["id"]
+        assert data[-1]["id"] == created[1]["id"]
+
+    def test_stats_use_positions(self, client, sample_todolist, rank_mode):
+        """Test que les statistiques s'appuient sur les positions dérivées des clés"""
+        created = [
+            client.post(f"/todolists/{sample_todolist.id}/todos", json={"name": name}).json()
+            for name in ["Todo A", "Todo B", "Todo C"]
+        ]
+        client.patch(f"/todos/{created[0]['id']}/toggle")
+
+        data = client.get(f"/todolists/{sample_todolist.id}/stats").json()
+
+        assert data["priority_distribution"] == {"1": 1, "2": 1, "3": 1}
+        assert data["completed_priority_distribution"] == {"1": 0, "2": 0, "3": 1}
+
+
+class TestRenumberPriorities:
+    """Tests du moteur de renumérotation en une requête"""
+
+    def test_renumber_active_then_completed(self, db_session, todolist_with_mixed_todos):
+        """Test que les actifs passent avant les terminés, sans trou"""
+        todolist = todolist_with_mixed_todos["todolist"]
+
+        changed = ordering.renumber_priorities(db_session, todolist.id)
+        db_session.commit()
+
+        todos = db_session.query(models.Todo).filter(
+            models.Todo.todolist_id == todolist.id
+        ).order_by(models.Todo.priority).all()
+        assert [t.priority for t in todos] == [1, 2, 3, 4, 5]
+        assert [t.completed for t in todos] == [False, False, False, True, True]
+        # Seuls les deux terminés (priorités 1 et 2) ont changé
+        assert changed == 2
+
+    def test_renumber_reports_no_change(self, db_session, sample_todos, sample_todolist):
+        """Test qu'une liste déjà cohérente ne provoque aucune écriture"""
+        assert ordering.renumber_priorities(db_session, sample_todolist.id) == 0
+
+    def test_renumber_scoped_to_todolist(self, db_session, complex_scenario):
+        """Test que seule la liste ciblée est renumérotée"""
+        other = complex_scenario["completed_todolist"]
+        other_todo = complex_scenario["completed_todos"][0]
+        other_todo.priority = 7
+        db_session.commit()
+
+        ordering.renumber_priorities(db_session, complex_scenario["work_todolist"].id)
+        db_session.commit()
+
+        db_session.refresh(other_todo)
+        assert other_todo.priority == 7
+        assert other.id == other_todo.todolist_id
+
+    def test_renumber_statement_compiles_for_postgresql(self):
+        """Test que la requête est valide pour PostgreSQL (UPDATE ... FROM)"""
+        from sqlalchemy.dialects import postgresql
+
+        sql = str(ordering.renumber_statement(1).compile(dialect=postgresql.dialect()))
+
+        assert "row_number() OVER" in sql
+        assert "FROM" in sql
+        assert "IS DISTINCT FROM" in sql
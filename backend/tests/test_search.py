@@ -0,0 +1,121 @@
+from fastapi import status
+
+from app.db import models
+from app.db.text import normalize_name
+
+
+class TestNormalizeName:
+    """Tests de la normalisation des noms"""
+
+    def test_accents_case_and_spaces(self):
+        assert normalize_name("  Crème   Brûlée ") == "creme brulee"
+
+    def test_french_ligatures(self):
+        assert normalize_name("Bœuf bourguignon") == "boeuf bourguignon"
+
+
+class TestSearchTodos:
+    """Tests pour /todos/search"""
+
+    def _add(self, db_session, todolist, names, completed=False):
+        todos = [
+            models.Todo(name=name, completed=completed, priority=index, todolist_id=todolist.id)
+            for index, name in enumerate(names, 1)
+        ]
+        db_session.add_all(todos)
+        db_session.commit()
+        return todos
+
+    def test_search_ignores_accents(self, client, db_session, sample_todolist):
+        """Test qu'une recherche sans accent trouve les noms accentués, et inversement"""
+        self._add(db_session, sample_todolist, ["Crème fraîche", "Pâtes", "Tomates"])
+
+        names = [t["name"] for t in client.get("/todos/search", params={"search": "creme"}).json()]
+        assert names == ["Crème fraîche"]
+        names = [t["name"] for t in client.get("/todos/search", params={"search": "PÂTES"}).json()]
+        assert names == ["Pâtes"]
+
+    def test_search_prefix_and_all_terms(self, client, db_session, sample_todolist):
+        """Test que chaque mot est cherché en préfixe et que tous doivent correspondre"""
+        self._add(db_session, sample_todolist, ["Tomates cerises", "Tomates", "Cerises"])
+
+        names = {t["name"] for t in client.get("/todos/search", params={"search": "tom"}).json()}
+        assert names == {"Tomates cerises", "Tomates"}
+        names = [t["name"] for t in client.get("/todos/search", params={"search": "tom cer"}).json()]
+        assert names == ["Tomates cerises"]
+
+    def test_search_ranks_best_match_first(self, client, db_session, sample_todolist):
+        """Test que le nom le plus pertinent arrive en tête"""
+        self._add(db_session, sample_todolist, ["Sauce tomate pour pâtes au basilic frais", "Tomate"])
+
+        data = client.get("/todos/search", params={"search": "tomate"}).json()
+
+        assert [t["name"] for t in data] == ["Tomate", "Sauce tomate pour pâtes au basilic frais"]
+
+    def test_search_follows_renames(self, client, db_session, sample_todos):
+        """Test que l'index suit les renommages"""
+        client.put(f"/todos/{sample_todos[0].id}", json={"name": "Épinards"})
+
+        data = client.get("/todos/search", params={"search": "epinards"}).json()
+
+        assert [t["id"] for t in data] == [sample_todos[0].id]
+        assert client.get("/todos/search", params={"search": "Todo 1"}).json() == []
+
+    def test_search_filters(self, client, db_session, sample_todolist, multiple_todolists):
+        """Test des filtres completed, priority et todolist_id"""
+        self._add(db_session, sample_todolist, ["Lait", "Lait d'amande"])
+        self._add(db_session, multiple_todolists[0], ["Lait de coco"], completed=True)
+
+        completed = client.get("/todos/search", params={"search": "lait", "completed": True}).json()
+        assert [t["name"] for t in completed] == ["Lait de coco"]
+        in_list = client.get("/todos/search", params={"search": "lait", "todolist_id": sample_todolist.id}).json()
+        assert {t["name"] for t in in_list} == {"Lait", "Lait d'amande"}
+        second = client.get(
+            "/todos/search", params={"search": "lait", "priority": 2, "todolist_id": sample_todolist.id}
+        ).json()
+        assert [t["name"] for t in second] == ["Lait d'amande"]
+
+    def test_search_pagination(self, client, db_session, sample_todolist):
+        """Test de la pagination par curseur sur les résultats classés"""
+        todos = self._add(db_session, sample_todolist, [f"Pomme {index}" for index in range(5)])
+
+        first = client.get("/todos/search", params={"search": "pomme", "limit": 3})
+        second = client.get(
+            "/todos/search", params={"search": "pomme", "limit": 3, "cursor": first.headers["X-Next-Cursor"]}
+        )
+
+        ids = [t["id"] for t in first.json() + second.json()]
+        assert sorted(ids) == sorted(t.id for t in todos)
+        assert "X-Next-Cursor" not in second.headers
+
+    def test_search_too_short(self, client):
+        """Test qu'une recherche de moins de 2 caractères est refusée"""
+        response = client.get("/todos/search", params={"search": "a"})
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_search_special_characters(self, client, db_session, sample_todolist):
+        """Test que la syntaxe FTS dans la recherche est neutralisée"""
+        self._add(db_session, sample_todolist, ["Sel"])
+
+        response = client.get("/todos/search", params={"search": 'sel"* ('})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [t["name"] for t in response.json()] == ["Sel"]
+
+    def test_search_statement_compiles_for_postgresql(self):
+        """Test que la requête classée est valide pour PostgreSQL"""
+        from sqlalchemy.dialects import postgresql
+        from app.db import search
+
+        class FakeBind:
+            dialect = postgresql.dialect()
+
+        class FakeSession:
+            def get_bind(self):
+                return FakeBind()
+
+        sql = str(search._ranked_ids(FakeSession(), ["tom"]).compile(dialect=postgresql.dialect()))
+
+        assert "to_tsvector" in sql and "similarity" in sql
+        assert "@@" in sql and "%" in sql
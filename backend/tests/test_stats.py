@@ -0,0 +1,119 @@
+import pytest
+from fastapi import status
+from sqlalchemy import event
+
+from app.db import models, stats
+
+
+@pytest.fixture
+def count_statements(db_session):
+    """Compte les requêtes SQL émises pendant un appel"""
+    def run(call):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db_session.get_bind(), "before_cursor_execute", before_cursor_execute)
+        try:
+            response = call()
+        finally:
+            event.remove(db_session.get_bind(), "before_cursor_execute", before_cursor_execute)
+        return response, len(statements)
+
+    return run
+
+
+class TestGlobalStats:
+    """Tests pour les statistiques globales"""
+
+    def test_stats_empty(self, client):
+        """Test des statistiques sans aucune donnée"""
+        response = client.get("/stats/")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["total_todos"] == 0
+        assert data["completion_rate"] == 0.0
+        assert data["total_lists"] == 0
+        assert data["todolists"] == []
+
+    def test_stats_totals(self, client, complex_scenario, empty_todolist):
+        """Test des totaux, du taux de completion et du détail par liste"""
+        response = client.get("/stats/")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert (data["total_todos"], data["completed_todos"], data["pending_todos"]) == (6, 4, 2)
+        assert data["completion_rate"] == 66.7
+        assert data["total_lists"] == 3
+        assert data["priority_distribution"] == {"1": 2, "2": 2, "3": 1, "4": 1}
+        assert data["completed_priority_distribution"] == {"1": 1, "2": 1, "3": 1, "4": 1}
+
+        per_list = {s["todolist_id"]: s for s in data["todolists"]}
+        work = per_list[complex_scenario["work_todolist"].id]
+        assert (work["total_todos"], work["completed_todos"], work["completion_rate"]) == (4, 2, 50.0)
+        assert work["average_priority"] == 2.5
+        assert per_list[empty_todolist.id]["total_todos"] == 0
+
+    def test_stats_query_count_is_constant(self, client, db_session, complex_scenario, count_statements):
+        """Test que le nombre de requêtes ne dépend pas du volume"""
+        _, small = count_statements(lambda: client.get("/stats/"))
+
+        for index in range(10):
+            todolist = models.TodoList(name=f"Liste {index}")
+            db_session.add(todolist)
+            db_session.flush()
+            db_session.add(models.Todo(name="Todo", completed=False, priority=1, todolist_id=todolist.id))
+        db_session.commit()
+
+        response, large = count_statements(lambda: client.get("/stats/"))
+
+        assert response.json()["total_lists"] == 12
+        assert large == small == 2
+
+    def test_stats_cache(self, client, db_session, sample_todos, monkeypatch):
+        """Test que le cache sert la valeur précédente pendant sa durée de vie"""
+        monkeypatch.setattr(stats, "STATS_CACHE_TTL", 60)
+        stats.clear_cache()
+        try:
+            first = client.get("/stats/").json()
+            db_session.add(models.Todo(name="Todo 4", completed=False, priority=4, todolist_id=sample_todos[0].todolist_id))
+            db_session.commit()
+
+            assert client.get("/stats/").json() == first
+            stats.clear_cache()
+            assert client.get("/stats/").json()["total_todos"] == first["total_todos"] + 1
+        finally:
+            stats.clear_cache()
+
+
+class TestTodoListStats:
+    """Tests pour les statistiques d'une TodoList"""
+
+    def test_todolist_stats(self, client, todolist_with_mixed_todos):
+        """Test des statistiques d'une liste avec todos mixtes"""
+        todolist = todolist_with_mixed_todos["todolist"]
+
+        response = client.get(f"/todolists/{todolist.id}/stats")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["todolist_id"] == todolist.id
+        assert data["total_todos"] == 5
+        assert data["completed_todos"] + data["pending_todos"] == 5
+        assert sum(data["priority_distribution"].values()) == 5
+
+    def test_todolist_stats_empty(self, client, empty_todolist):
+        """Test des statistiques d'une liste vide"""
+        response = client.get(f"/todolists/{empty_todolist.id}/stats")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["total_todos"] == 0
+        assert response.json()["priority_distribution"] == {}
+
+    def test_todolist_stats_not_found(self, client):
+        """Test des statistiques d'une liste inexistante"""
+        response = client.get("/todolists/999/stats")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,88 @@
+import pytest
+from fastapi import status
+
+from app import suggestions
+from app.db import models
+from app.suggestions import PrefixIndex
+
+
+@pytest.fixture(autouse=True)
+def reset_index():
+    """L'index est global au processus : on repart d'un index vide à chaque test"""
+    suggestions.index.clear()
+    yield
+    suggestions.index.clear()
+
+
+class TestPrefixIndex:
+    """Tests unitaires de l'index de préfixes"""
+
+    def test_top_k_by_usage(self):
+        """Test que les noms les plus utilisés sortent en premier"""
+        index = PrefixIndex()
+        index.loaded = True
+        for name, count in [("Tomates", 5), ("Tofu", 2), ("Thé", 9), ("Tomme", 3)]:
+            index.add(name, count)
+
+        assert index.suggest("to", 2) == [("Tomates", 5), ("Tomme", 3)]
+        assert index.suggest("t") == [("Thé", 9), ("Tomates", 5), ("Tomme", 3), ("Tofu", 2)]
+        assert index.suggest("x") == []
+
+    def test_accents_and_case(self):
+        """Test que préfixes et noms sont comparés sous forme normalisée"""
+        index = PrefixIndex()
+        index.add("Crème fraîche")
+        index.add("creme fraiche")
+
+        assert index.suggest("CRÈ") == [("creme fraiche", 2)]
+
+    def test_memory_cap_evicts_least_used(self):
+        """Test que le plafond évince les noms les moins utilisés"""
+        index = PrefixIndex(max_entries=10)
+        index.add("Pain", 100)
+        for number in range(20):
+            index.add(f"Article {number:02d}")
+
+        assert len(index) <= 10
+        assert index.suggest("pa") == [("Pain", 100)]
+
+
+class TestSuggestEndpoint:
+    """Tests pour /todos/suggest"""
+
+    def test_built_from_existing_todos(self, client, db_session, sample_todolist):
+        """Test que l'index est construit à partir des todos existantes"""
+        db_session.add_all([
+            models.Todo(name=name, completed=False, priority=index, todolist_id=sample_todolist.id)
+            for index, name in enumerate(["Lait", "Lait", "Lardons", "Pain"], 1)
+        ])
+        db_session.commit()
+
+        response = client.get("/todos/suggest", params={"prefix": "la"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == [{"name": "Lait", "count": 2}, {"name": "Lardons", "count": 1}]
+
+    def test_updated_on_insert(self, client, sample_todolist):
+        """Test que les todos ajoutées après construction sont suggérées"""
+        client.get("/todos/suggest", params={"prefix": "be"})
+        for _ in range(3):
+            client.post(f"/todolists/{sample_todolist.id}/todos", json={"name": "Beurre"})
+
+        response = client.get("/todos/suggest", params={"prefix": "beu"})
+
+        assert response.json() == [{"name": "Beurre", "count": 3}]
+
+    def test_rolled_back_insert_ignored(self, db_session, client, sample_todolist):
+        """Test qu'une insertion annulée n'alimente pas l'index"""
+        client.get("/todos/suggest", params={"prefix": "zz"})
+        db_session.add(models.Todo(name="Zeste", completed=False, priority=1, todolist_id=sample_todolist.id))
+        db_session.flush()
+        db_session.rollback()
+
+        assert client.get("/todos/suggest", params={"prefix": "ze"}).json() == []
+
+    def test_prefix_required(self, client):
+        """Test qu'un préfixe vide est refusé"""
+        assert client.get("/todos/suggest").status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert client.get("/todos/suggest", params={"prefix": ""}).status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
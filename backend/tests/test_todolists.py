@@ -1,5 +1,8 @@
 import pytest
 from fastapi import status
+from sqlalchemy import event
+
+from app.db import models
 
 
 class TestTodoListsCRUD:
@@ -122,6 +125,69 @@ class TestTodoListsCRUD:
         assert response.status_code == status.HTTP_404_NOT_FOUND
 
 
+class TestTodoListsSummary:
+    """Tests pour le résumé des TodoLists"""
+
+    def test_summary_counts(self, client, complex_scenario, empty_todolist):
+        """Test des compteurs par liste, y compris une liste vide"""
+        response = client.get("/todolists/summary")
+
+        assert response.status_code == status.HTTP_200_OK
+        summaries = {s["id"]: s for s in response.json()}
+        work = summaries[complex_scenario["work_todolist"].id]
+        assert (work["total"], work["completed"], work["pending"]) == (4, 2, 2)
+        done = summaries[complex_scenario["completed_todolist"].id]
+        assert (done["total"], done["completed"], done["pending"]) == (2, 2, 0)
+        empty = summaries[empty_todolist.id]
+        assert (empty["total"], empty["completed"], empty["pending"]) == (0, 0, 0)
+        assert "todos" not in work
+
+    def test_summary_single_query(self, client, db_session, complex_scenario):
+        """Test que le résumé est lu en une seule requête, sans parcourir les todos"""
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db_session.get_bind(), "before_cursor_execute", before_cursor_execute)
+        try:
+            response = client.get("/todolists/summary")
+        finally:
+            event.remove(db_session.get_bind(), "before_cursor_execute", before_cursor_execute)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(statements) == 1
+        assert "todos" not in statements[0]
+
+    def test_summary_category_filter(self, client, db_session, multiple_todolists):
+        """Test du filtre par catégorie et de la catégorie renvoyée"""
+        category = models.Category(name="Maison", color="#000000", icon="home")
+        db_session.add(category)
+        db_session.commit()
+        multiple_todolists[1].category_id = category.id
+        db_session.commit()
+
+        response = client.get("/todolists/summary", params={"category_id": category.id})
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert [s["id"] for s in data] == [multiple_todolists[1].id]
+        assert data[0]["category"]["name"] == "Maison"
+
+    def test_summary_pagination(self, client, multiple_todolists):
+        """Test de la pagination par curseur, identique à la liste complète"""
+        first = client.get("/todolists/summary", params={"limit": 2})
+        cursor = first.headers["X-Next-Cursor"]
+        second = client.get("/todolists/summary", params={"limit": 2, "cursor": cursor})
+
+        ids = [s["id"] for s in first.json() + second.json()]
+        assert ids == sorted(t.id for t in multiple_todolists)
+        assert "X-Next-Cursor" not in second.headers
+
+        full = client.get("/todolists/", params={"limit": 2, "cursor": cursor})
+        assert [t["id"] for t in full.json()] == [s["id"] for s in second.json()]
+
+
 class TestTodoListsTodos:
     """Tests pour la gestion des todos dans les TodoLists"""
     
@@ -192,6 +258,74 @@ class TestTodoListsTodos:
         assert response.json()["detail"] == "Todolist not found"
 
 
+class TestReorderTodos:
+    """Tests pour la réorganisation des todos d'une TodoList"""
+
+    @staticmethod
+    def _capture_updates(db_session):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("UPDATE TODOS"):
+                statements.append(statement)
+
+        event.listen(db_session.get_bind(), "before_cursor_execute", before_cursor_execute)
+        return statements, lambda: event.remove(db_session.get_bind(), "before_cursor_execute", before_cursor_execute)
+
+    def test_reorder_full_list_single_update(self, client, db_session, complex_todolist_with_todos):
+        """Test qu'une réorganisation complète s'écrit en une seule requête, actifs en premier"""
+        todolist = complex_todolist_with_todos["todolist"]
+        active, completed = complex_todolist_with_todos["active_todos"], complex_todolist_with_todos["completed_todos"]
+        new_order = [completed[1].id, active[1].id, completed[0].id, active[0].id]
+
+        statements, stop = self._capture_updates(db_session)
+        try:
+            response = client.put(f"/todolists/{todolist.id}/todos/reorder", json=new_order)
+        finally:
+            stop()
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(statements) == 1
+        data = client.get(f"/todolists/{todolist.id}/todos").json()
+        assert [t["id"] for t in data] == [active[1].id, active[0].id, completed[1].id, completed[0].id]
+        assert [t["priority"] for t in data] == [1, 2, 3, 4]
+
+    def test_reorder_partial_list(self, client, sample_todolist, sample_todos):
+        """Test qu'une réorganisation partielle garde des priorités continues"""
+        response = client.put(f"/todolists/{sample_todolist.id}/todos/reorder", json=[sample_todos[1].id])
+
+        assert response.status_code == status.HTTP_200_OK
+        data = client.get(f"/todolists/{sample_todolist.id}/todos").json()
+        assert [t["id"] for t in data] == [sample_todos[1].id, sample_todos[0].id, sample_todos[2].id]
+        assert [t["priority"] for t in data] == [1, 2, 3]
+
+    def test_reorder_diff_mode_only_writes_moved_todos(self, client, db_session, sample_todolist):
+        """Test que le mode diff ne réécrit que les todos déplacées"""
+        todos = [
+            models.Todo(name=f"Todo {index}", completed=False, priority=index, todolist_id=sample_todolist.id)
+            for index in range(1, 6)
+        ]
+        db_session.add_all(todos)
+        db_session.commit()
+        new_order = [todos[0].id, todos[2].id, todos[1].id, todos[3].id, todos[4].id]
+
+        response = client.put(
+            f"/todolists/{sample_todolist.id}/todos/reorder", params={"diff": True}, json=new_order
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        for todo in todos:
+            db_session.refresh(todo)
+        assert [todo.priority for todo in todos] == [1, 3, 2, 4, 5]
+
+    def test_reorder_unknown_todo(self, client, sample_todolist, sample_todos):
+        """Test qu'un id absent de la TodoList est refusé"""
+        response = client.put(f"/todolists/{sample_todolist.id}/todos/reorder", json=[sample_todos[0].id, 999])
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.json()["detail"] == "Todos doesn't exist in this todolist"
+
+
 class TestPopulateFromLinks:
     def test_populate_from_links(self, client, db_session):
         course_cat = models.Category(name="courses", color="#000000", icon="cart")
@@ -217,3 +351,125 @@ class TestPopulateFromLinks:
         data = response.json()
         assert len(data["todos"]) == 1
         assert data["todos"][0]["name"] == "Tomate"
+
+
+class TestTodoListVersioning:
+    """Tests pour les versions de TodoList (ETag / If-Match)"""
+
+    def test_get_todolist_returns_etag(self, client, sample_todolist):
+        """Test que la lecture d'une TodoList expose son ETag"""
+        response = client.get(f"/todolists/{sample_todolist.id}")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["ETag"] == f'"{sample_todolist.id}-1"'
+
+    def test_write_with_matching_etag(self, client, sample_todolist, sample_todos):
+        """Test qu'une écriture avec le bon ETag passe et incrémente la version"""
+        etag = client.get(f"/todolists/{sample_todolist.id}").headers["ETag"]
+
+        response = client.patch(f"/todos/{sample_todos[0].id}/toggle", headers={"If-Match": etag})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["ETag"] == f'"{sample_todolist.id}-2"'
+        assert client.get(f"/todolists/{sample_todolist.id}").headers["ETag"] == response.headers["ETag"]
+
+    def test_write_with_stale_etag(self, client, sample_todolist, sample_todos):
+        """Test qu'une écriture avec un ETag périmé est refusée sans rien modifier"""
+        stale_etag = client.get(f"/todolists/{sample_todolist.id}").headers["ETag"]
+        client.post(f"/todolists/{sample_todolist.id}/todos", json={"name": "Todo 4"})
+
+        response = client.patch(f"/todos/{sample_todos[0].id}/toggle", headers={"If-Match": stale_etag})
+
+        assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+        todos = client.get(f"/todolists/{sample_todolist.id}/todos").json()
+        assert next(t for t in todos if t["id"] == sample_todos[0].id)["completed"] == False
+
+    def test_write_with_wildcard_etag(self, client, sample_todolist):
+        """Test que `If-Match: *` accepte n'importe quelle version"""
+        response = client.put(
+            f"/todolists/{sample_todolist.id}", json={"name": "Nouveau nom"}, headers={"If-Match": "*"}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["ETag"] == f'"{sample_todolist.id}-2"'
+
+    def test_delete_with_stale_etag(self, client, sample_todolist):
+        """Test qu'une suppression avec un ETag périmé est refusée"""
+        response = client.delete(f"/todolists/{sample_todolist.id}", headers={"If-Match": '"0-0"'})
+
+        assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+        assert client.get(f"/todolists/{sample_todolist.id}").status_code == status.HTTP_200_OK
+
+
+class TestEagerLoading:
+    """Tests du chargement explicite des relations (pas de N+1)"""
+
+    @staticmethod
+    def _seed(db_session, count):
+        category = models.Category(name=f"Catégorie {count}", color="#000000", icon="folder")
+        db_session.add(category)
+        db_session.commit()
+        for index in range(count):
+            todolist = models.TodoList(name=f"Liste {count}-{index}", category_id=category.id)
+            db_session.add(todolist)
+            db_session.flush()
+            db_session.add_all([
+                models.Todo(name=f"Todo {priority}", completed=False, priority=priority, todolist_id=todolist.id)
+                for priority in (1, 2)
+            ])
+        db_session.commit()
+        db_session.expire_all()
+
+    @staticmethod
+    def _count_selects(db_session, call):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                statements.append(statement)
+
+        event.listen(db_session.get_bind(), "before_cursor_execute", before_cursor_execute)
+        try:
+            response = call()
+        finally:
+            event.remove(db_session.get_bind(), "before_cursor_execute", before_cursor_execute)
+        return response, len(statements)
+
+    def test_get_todolists_query_count_is_constant(self, client, db_session):
+        """Test que le nombre de requêtes ne dépend pas du nombre de TodoLists"""
+        self._seed(db_session, 1)
+        _, small = self._count_selects(db_session, lambda: client.get("/todolists/"))
+
+        self._seed(db_session, 10)
+        response, large = self._count_selects(db_session, lambda: client.get("/todolists/"))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()) == 11
+        assert all(len(t["todos"]) == 2 for t in response.json())
+        assert large == small
+
+    def test_get_todos_from_list_query_count_is_constant(self, client, db_session, sample_todolist):
+        """Test que la TodoList imbriquée dans chaque todo n'est pas relue"""
+        for priority in range(1, 11):
+            db_session.add(models.Todo(name=f"Todo {priority}", completed=False, priority=priority, todolist_id=sample_todolist.id))
+        db_session.commit()
+        todolist_id = sample_todolist.id
+        db_session.expire_all()
+
+        response, count = self._count_selects(
+            db_session, lambda: client.get(f"/todolists/{todolist_id}/todos")
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()) == 10
+        assert count == 2
+
+    def test_lazy_load_raises(self, db_session, sample_todos, sample_todolist):
+        """Test qu'une relation non chargée explicitement lève une erreur"""
+        from sqlalchemy.exc import InvalidRequestError
+
+        db_session.expire_all()
+        todolist = db_session.query(models.TodoList).filter(models.TodoList.id == sample_todolist.id).one()
+
+        with pytest.raises(InvalidRequestError):
+            todolist.todos
@@ -1,6 +1,8 @@
 import pytest
 from fastapi import status
 
+from app.db import models
+
 
 class TestTodosCRUD:
     """Tests pour les opérations CRUD des Todos"""
@@ -91,6 +93,58 @@ class TestTodosCRUD:
         assert response.json()["detail"] == "Todo not found"
 
 
+class TestTodosPagination:
+    """Tests pour la pagination par curseur de GET /todos/"""
+
+    def test_pages_cover_all_todos_once(self, client, complex_scenario):
+        """Test que le parcours des pages renvoie chaque todo une seule fois, dans l'ordre"""
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = client.get("/todos/", params=params)
+            assert response.status_code == status.HTTP_200_OK
+            assert len(response.json()) <= 2
+            seen.extend(response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        expected = sorted(complex_scenario["all_todos"], key=lambda t: (t.todolist_id, t.priority, t.id))
+        assert [t["id"] for t in seen] == [t.id for t in expected]
+
+    def test_last_page_has_no_cursor(self, client, sample_todos):
+        """Test qu'aucun curseur n'est renvoyé quand tout tient dans la page"""
+        response = client.get("/todos/", params={"limit": 10})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()) == 3
+        assert "X-Next-Cursor" not in response.headers
+
+    def test_filters(self, client, complex_scenario):
+        """Test des filtres completed et todolist_id"""
+        work_todolist = complex_scenario["work_todolist"]
+
+        response = client.get("/todos/", params={"completed": True, "todolist_id": work_todolist.id})
+
+        data = response.json()
+        assert [t["name"] for t in data] == ["Review code", "Send emails"]
+
+    def test_invalid_cursor(self, client, sample_todos):
+        """Test qu'un curseur illisible est refusé"""
+        response = client.get("/todos/", params={"cursor": "not-a-cursor"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"] == "Invalid cursor"
+
+    def test_limit_bounds(self, client):
+        """Test des bornes du paramètre limit"""
+        assert client.get("/todos/", params={"limit": 0}).status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert client.get("/todos/", params={"limit": 100000}).status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
 class TestTodoToggle:
     """Tests pour la fonctionnalité de toggle des todos"""
     
@@ -162,6 +216,46 @@ class TestTodoToggle:
         assert completed_todos[0]["priority"] > max(active_priorities)
 
 
+    def test_toggle_shifts_only_affected_range(self, client, db_session, sample_todolist):
+        """Test qu'un toggle ne touche que la plage entre le todo et la frontière actifs/terminés"""
+        todos = [
+            models.Todo(name=f"Todo {index}", completed=index > 4, priority=index, todolist_id=sample_todolist.id)
+            for index in range(1, 7)
+        ]
+        db_session.add_all(todos)
+        db_session.commit()
+
+        # Actif en position 2 -> devient le premier terminé (position 4)
+        response = client.patch(f"/todos/{todos[1].id}/toggle")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["priority"] == 4
+
+        data = client.get(f"/todolists/{sample_todolist.id}/todos").json()
+        assert [t["name"] for t in data] == ["Todo 1", "Todo 3", "Todo 4", "Todo 2", "Todo 5", "Todo 6"]
+        assert [t["priority"] for t in data] == [1, 2, 3, 4, 5, 6]
+
+        # Terminé en position 6 -> devient le dernier actif (position 4)
+        response = client.patch(f"/todos/{todos[5].id}/toggle")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["priority"] == 4
+
+        data = client.get(f"/todolists/{sample_todolist.id}/todos").json()
+        assert [t["name"] for t in data] == ["Todo 1", "Todo 3", "Todo 4", "Todo 6", "Todo 2", "Todo 5"]
+        assert [t["priority"] for t in data] == [1, 2, 3, 4, 5, 6]
+
+    def test_toggle_inconsistent_list_falls_back_to_renumbering(self, client, todolist_with_mixed_todos):
+        """Test qu'une liste mal numérotée est renumérotée entièrement lors du toggle"""
+        todolist = todolist_with_mixed_todos["todolist"]
+        active_todo = todolist_with_mixed_todos["active_todos"][0]
+
+        response = client.patch(f"/todos/{active_todo.id}/toggle")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = client.get(f"/todolists/{todolist.id}/todos").json()
+        assert [t["priority"] for t in data] == [1, 2, 3, 4, 5]
+        assert [t["completed"] for t in data] == [False, False, True, True, True]
+
+
 class TestTodoPriorityManagement:
     """Tests pour la gestion automatique des priorités"""
     # sample_todolist, sample_todos ?
@@ -1,10 +1,6 @@
 import { ref, computed } from 'vue';
-import { todoListsApi } from '../services/api';
-import type { Todo, TodoList } from '../services/api';
-
-type TodoWithList = Omit<Todo, 'todolist'> & {
-  todolist?: TodoList;
-};
+import { statsApi } from '../services/api';
+import type { DayActivity, GlobalStats, TodoList } from '../services/api';
 
 interface DayStats {
   date: string;
@@ -37,32 +33,29 @@ interface ProductivityStats {
   streak: number;
 }
 
-const allTodos = ref<TodoWithList[]>([]);
-const allTodoLists = ref<TodoList[]>([]);
+const serverStats = ref<GlobalStats | null>(null);
+const activity = ref<DayActivity[]>([]);
 const loading = ref(false);
 
+// Nombre de jours d'activité chargés (productivité mensuelle, série)
+const ACTIVITY_DAYS = 30;
+
+const toIsoDate = (date: Date) => date.toISOString().split('T')[0];
+
 export function useStatistics() {
   
-  // Charger toutes les données pour les statistiques
+  // Charger les statistiques agrégées par le serveur (une seule requête)
   const loadAllData = async () => {
     loading.value = true;
     try {
-      // Charger toutes les todolists
-      allTodoLists.value = await todoListsApi.getAll();
-      
-      // Charger tous les todos
-      const allTodosData: TodoWithList[] = [];
-      
-      for (const todolist of allTodoLists.value) {
-        const todos = await todoListsApi.getTodos(todolist.id);
-        const todosWithList = todos.map(todo => ({
-          ...todo,
-          todolist
-        }));
-        allTodosData.push(...todosWithList);
-      }
-      
-      allTodos.value = allTodosData;
+      const to = new Date();
+      const from = new Date(to);
+      from.setUTCDate(from.getUTCDate() - (ACTIVITY_DAYS - 1));
+
+      [serverStats.value, activity.value] = await Promise.all([
+        statsApi.getGlobal(),
+        statsApi.getTimeseries(toIsoDate(from), toIsoDate(to)),
+      ]);
     } catch (error) {
       console.error('Erreur lors du chargement des données:', error);
     } finally {
@@ -70,119 +63,82 @@ export function useStatistics() {
     }
   };
 
+  // TodoLists connues des statistiques
+  const allTodoLists = computed((): TodoList[] =>
+    (serverStats.value?.todolists ?? []).map(stat => ({ id: stat.todolist_id, name: stat.name }))
+  );
+
   // Statistiques générales
   const generalStats = computed(() => {
-    const total = allTodos.value.length;
-    const completed = allTodos.value.filter(t => t.completed).length;
-    const pending = total - completed;
-    const completionRate = total > 0 ? Math.round((completed / total) * 100) : 0;
-    
-    const avgPriority = total > 0 
-      ? Math.round(allTodos.value.reduce((sum, t) => sum + t.priority, 0) / total * 10) / 10
-      : 0;
+    const stats = serverStats.value;
+    const total = stats?.total_todos ?? 0;
+    const completed = stats?.completed_todos ?? 0;
 
     return {
       total,
       completed,
-      pending,
-      completionRate,
-      avgPriority,
-      totalLists: allTodoLists.value.length
+      pending: stats?.pending_todos ?? 0,
+      completionRate: Math.round(stats?.completion_rate ?? 0),
+      avgPriority: stats?.average_priority ?? 0,
+      totalLists: stats?.total_lists ?? 0
     };
   });
 
   // Statistiques par priorité
   const priorityStats = computed((): PriorityStats[] => {
-    const priorities = new Map<number, { total: number; completed: number }>();
-    
-    allTodos.value.forEach(todo => {
-      const priority = todo.priority;
-      if (!priorities.has(priority)) {
-        priorities.set(priority, { total: 0, completed: 0 });
-      }
-      
-      const stats = priorities.get(priority)!;
-      stats.total++;
-      if (todo.completed) stats.completed++;
-    });
+    const distribution = serverStats.value?.priority_distribution ?? {};
+    const completedDistribution = serverStats.value?.completed_priority_distribution ?? {};
 
-    return Array.from(priorities.entries())
-      .map(([priority, stats]) => ({
-        priority,
-        count: stats.total,
-        completed: stats.completed,
-        percentage: Math.round((stats.completed / stats.total) * 100)
-      }))
+    return Object.entries(distribution)
+      .map(([priority, count]) => {
+        const completed = completedDistribution[priority] ?? 0;
+        return {
+          priority: Number(priority),
+          count,
+          completed,
+          percentage: Math.round((completed / count) * 100)
+        };
+      })
       .sort((a, b) => a.priority - b.priority);
   });
 
   // Statistiques par TodoList
   const todoListStats = computed((): TodoListStats[] => {
-    return allTodoLists.value.map(todolist => {
-      const todos = allTodos.value.filter(t => t.todolist?.id === todolist.id);
-      const completed = todos.filter(t => t.completed).length;
-      const total = todos.length;
-      const completionRate = total > 0 ? Math.round((completed / total) * 100) : 0;
-      const avgPriority = total > 0 
-        ? Math.round(todos.reduce((sum, t) => sum + t.priority, 0) / total * 10) / 10
-        : 0;
-
-      return {
-        todolist,
-        totalTodos: total,
-        completedTodos: completed,
-        completionRate,
-        avgPriority
-      };
-    }).sort((a, b) => b.completionRate - a.completionRate);
+    return (serverStats.value?.todolists ?? []).map(stat => ({
+      todolist: { id: stat.todolist_id, name: stat.name },
+      totalTodos: stat.total_todos,
+      completedTodos: stat.completed_todos,
+      completionRate: Math.round(stat.completion_rate),
+      avgPriority: stat.average_priority
+    })).sort((a, b) => b.completionRate - a.completionRate);
   });
 
-  // Statistiques temporelles (simulées - dans la vraie vie on aurait des timestamps)
+  // Statistiques temporelles (7 derniers jours, issues des agrégats journaliers)
   const timeStats = computed((): DayStats[] => {
-    // Simulation de données sur 7 jours
-    const days = [];
-    const today = new Date();
-    
-    for (let i = 6; i >= 0; i--) {
-      const date = new Date(today);
-      date.setDate(date.getDate() - i);
-      
-      // Simulation basée sur les données existantes
-      const totalTodos = allTodos.value.length;
-      const completedTodos = allTodos.value.filter(t => t.completed).length;
-      
-      // Distribution simulée sur 7 jours
-      const dayFactor = Math.random() * 0.5 + 0.5; // 0.5 à 1
-      const completed = Math.round((completedTodos / 7) * dayFactor);
-      const created = Math.round((totalTodos / 7) * dayFactor);
-      
-      days.push({
-        date: date.toISOString().split('T')[0],
-        completed,
-        created,
-        total: allTodos.value.length
-      });
-    }
-    
-    return days;
+    return activity.value.slice(-7).map(day => ({
+      date: day.date,
+      completed: day.completed,
+      created: day.created,
+      total: generalStats.value.total
+    }));
   });
 
   // Statistiques de productivité
   const productivityStats = computed((): ProductivityStats => {
-    const timeData = timeStats.value;
-    const today = timeData[timeData.length - 1];
-    const thisWeek = timeData.slice(-7);
-    
-    const weekCompleted = thisWeek.reduce((sum, day) => sum + day.completed, 0);
-    const monthCompleted = Math.round(weekCompleted * 4.3); // Estimation mensuelle
-    
-    const bestDay = timeData.reduce((best, day) => 
-      day.completed > best.completed ? day : best, timeData[0]);
+    const days = activity.value;
+    const today = days[days.length - 1];
+    const weekCompleted = days.slice(-7).reduce((sum, day) => sum + day.completed, 0);
+    const monthCompleted = days.reduce((sum, day) => sum + day.completed, 0);
+
+    const bestDay = days.reduce(
+      (best, day) => (day.completed > best.completed ? day : best),
+      days[0] ?? { date: toIsoDate(new Date()), created: 0, completed: 0 }
+    );
 
-    // Simulation d'une streak
+    // Jours consécutifs avec au moins une complétion, jusqu'à aujourd'hui
     let streak = 0;
-    for (let i = timeData.length - 1; i >= 0; i--) {
-      if (timeData[i].completed > 0) {
+    for (let i = days.length - 1; i >= 0; i--) {
+      if (days[i].completed > 0) {
         streak++;
       } else {
         break;
@@ -311,7 +267,8 @@ export function useStatistics() {
 
   return {
     // État
-    allTodos,
+    serverStats,
+    activity,
     allTodoLists,
     loading,
     
@@ -27,6 +27,16 @@ export interface TodoList {
   category?: Category;
 }
 
+export interface TodoListSummary {
+  id: number;
+  name: string;
+  category_id?: number;
+  category?: Category;
+  total: number;
+  completed: number;
+  pending: number;
+}
+
 export interface CreateTodoRequest {
   name: string;
   completed?: boolean;
@@ -67,11 +77,11 @@ export class ApiError extends Error {
   }
 }
 
-// Fonction utilitaire pour les requêtes
-async function apiRequest<T>(
+// Fonction utilitaire pour les requêtes (réponse brute, pour lire les en-têtes)
+async function apiFetch(
   endpoint: string,
   options: RequestInit = {}
-): Promise<T> {
+): Promise<Response> {
   const url = `${API_BASE_URL}${endpoint}`;
 
   const defaultOptions: RequestInit = {
@@ -97,6 +107,15 @@ async function apiRequest<T>(
     );
   }
 
+  return response;
+}
+
+// Fonction utilitaire pour les requêtes
+async function apiRequest<T>(
+  endpoint: string,
+  options: RequestInit = {}
+): Promise<T> {
+  const response = await apiFetch(endpoint, options);
   return response.json();
 }
 
@@ -107,6 +126,12 @@ export const todoListsApi = {
     return apiRequest<TodoList[]>('/todolists/');
   },
 
+  // Récupérer le résumé des todolists (compteurs, sans les todos)
+  async getSummary(categoryId?: number): Promise<TodoListSummary[]> {
+    const suffix = categoryId !== undefined ? `?category_id=${categoryId}` : '';
+    return apiRequest<TodoListSummary[]>(`/todolists/summary${suffix}`);
+  },
+
   // Récupérer une todolist par ID
   async getById(id: number): Promise<TodoList> {
     return apiRequest<TodoList>(`/todolists/${id}`);
@@ -210,10 +235,64 @@ export const categoriesApi = {
 };
 
 // API Todos
+export interface TodoPageParams {
+  limit?: number;
+  cursor?: string;
+  completed?: boolean;
+  todolistId?: number;
+}
+
+export interface TodoSearchParams extends TodoPageParams {
+  search: string;
+}
+
+export interface TodoPage {
+  items: Todo[];
+  nextCursor: string | null;
+}
+
 export const todosApi = {
-  // Récupérer tous les todos
+  // Récupérer une page de todos (pagination par curseur)
+  async getPage(params: TodoPageParams = {}): Promise<TodoPage> {
+    const query = new URLSearchParams();
+    if (params.limit !== undefined) query.set('limit', String(params.limit));
+    if (params.cursor) query.set('cursor', params.cursor);
+    if (params.completed !== undefined) query.set('completed', String(params.completed));
+    if (params.todolistId !== undefined) query.set('todolist_id', String(params.todolistId));
+
+    const suffix = query.toString() ? `?${query.toString()}` : '';
+    const response = await apiFetch(`/todos/${suffix}`);
+    return {
+      items: await response.json(),
+      nextCursor: response.headers.get('X-Next-Cursor'),
+    };
+  },
+
+  // Rechercher des todos par nom (insensible aux accents), classés par pertinence
+  async search(params: TodoSearchParams): Promise<TodoPage> {
+    const query = new URLSearchParams({ search: params.search });
+    if (params.limit !== undefined) query.set('limit', String(params.limit));
+    if (params.cursor) query.set('cursor', params.cursor);
+    if (params.completed !== undefined) query.set('completed', String(params.completed));
+    if (params.todolistId !== undefined) query.set('todolist_id', String(params.todolistId));
+
+    const response = await apiFetch(`/todos/search?${query.toString()}`);
+    return {
+      items: await response.json(),
+      nextCursor: response.headers.get('X-Next-Cursor'),
+    };
+  },
+
+  // Récupérer tous les todos (en suivant les curseurs)
   async getAll(): Promise<Todo[]> {
-    return apiRequest<Todo[]>('/todos/');
+    const todos: Todo[] = [];
+    let cursor: string | undefined;
+    do {
+      const page = await todosApi.getPage({ limit: 1000, cursor });
+      todos.push(...page.items);
+      cursor = page.nextCursor ?? undefined;
+    } while (cursor);
+    return todos;
   },
 
   // Mettre à jour un todo
@@ -239,6 +318,50 @@ export const todosApi = {
   },
 };
 
+// API Statistiques (agrégats calculés côté serveur)
+export interface TodoStats {
+  total_todos: number;
+  completed_todos: number;
+  pending_todos: number;
+  completion_rate: number;
+  average_priority: number;
+  priority_distribution: Record<string, number>;
+  completed_priority_distribution: Record<string, number>;
+}
+
+export interface TodoListStats extends TodoStats {
+  todolist_id: number;
+  name: string;
+}
+
+export interface GlobalStats extends TodoStats {
+  total_lists: number;
+  todolists: TodoListStats[];
+}
+
+export interface DayActivity {
+  date: string;
+  created: number;
+  completed: number;
+}
+
+export const statsApi = {
+  // Statistiques globales et par todolist
+  async getGlobal(): Promise<GlobalStats> {
+    return apiRequest<GlobalStats>('/stats/');
+  },
+
+  // Statistiques d'une todolist
+  async getByTodoList(id: number): Promise<TodoListStats> {
+    return apiRequest<TodoListStats>(`/todolists/${id}/stats`);
+  },
+
+  // Activité quotidienne (créations / complétions) entre deux dates incluses (YYYY-MM-DD)
+  async getTimeseries(from: string, to: string): Promise<DayActivity[]> {
+    return apiRequest<DayActivity[]>(`/stats/timeseries?from=${from}&to=${to}`);
+  },
+};
+
 // Fonctions utilitaires
 export const apiUtils = {
   // Test de connexion à l'API